@@ -0,0 +1,412 @@
+"""Fake SSH fleet for offline load tests.
+
+Starts N asyncssh servers on loopback that answer the commands the bot
+runs (health probe, host facts, /proc snapshot, metrics sampler, free, df, uptime,
+docker ps, ...) with generated output, and writes a matching hosts.json.
+
+Run standalone to point a real bot at it:
+
+    python bench/fleet.py --hosts 50 --out hosts.json
+"""
+import os
+import re
+import sys
+import json
+import base64
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import resource
+from dataclasses import dataclass
+import asyncssh
+
+# Command prefixes of the bot's generated shell scripts
+PROBE_PREFIX = "echo v="
+FACTS_PREFIX = "echo facts="
+SNAPSHOT_PREFIX = "echo @@"
+SAMPLER_PREFIX = "c=$(nproc)"
+
+_SLEEP_RE = re.compile(r"sleep (\d+(?:\.\d+)?)")
+
+CONTAINER_IMAGES = ("nginx", "postgres", "redis", "grafana", "prometheus", "node-exporter", "app", "worker")
+
+
+@dataclass
+class FleetOptions:
+    hosts: int = 10
+    latency: float = 0.02     # mean seconds before a command answers
+    jitter: float = 0.01      # standard deviation of the latency
+    fail_rate: float = 0.0    # fraction of commands exiting 1
+    drop_rate: float = 0.0    # fraction of commands whose connection is aborted
+    down: float = 0.0         # fraction of hosts with a closed port
+    seed: int = 1
+
+
+@dataclass
+class FleetStats:
+    connections: int = 0
+    open_connections: int = 0
+    peak_connections: int = 0
+    commands: int = 0
+    failures: int = 0
+    drops: int = 0
+
+
+class FakeHost:
+    """Randomized but slowly drifting state of one fake machine."""
+
+    def __init__(self, host_id: str, options: FleetOptions, stats: FleetStats, rng: random.Random):
+        self.host_id = host_id
+        self.options = options
+        self.stats = stats
+        self.rng = rng
+        self.port = None
+        self.boot_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        self.booted = time.time() - rng.uniform(3600, 90 * 86400)
+        self.cpus = rng.choice((1, 2, 4, 8, 16))
+        self.mem_total_kb = rng.choice((1, 2, 4, 8, 16, 32)) * 1024 * 1024
+        self.mem_used = rng.uniform(0.2, 0.9)
+        self.load = rng.uniform(0.05, 1.2) * self.cpus
+        self.disk_blocks = rng.choice((10, 20, 50, 100, 500)) * 262144
+        self.disk_used = rng.uniform(0.1, 0.92)
+        self.jiffies = [rng.randrange(10 ** 6, 10 ** 8) for _ in range(8)]
+        self.containers = [
+            f"{rng.choice(CONTAINER_IMAGES)}-{i}" for i in range(rng.randrange(0, 12))
+        ]
+
+    def _drift(self):
+        rng = self.rng
+        self.mem_used = min(max(self.mem_used + rng.gauss(0, 0.01), 0.05), 0.99)
+        self.load = max(self.load + rng.gauss(0, 0.05) * self.cpus, 0.0)
+        self.disk_used = min(self.disk_used + rng.uniform(0, 0.0005), 0.999)
+        busy = min(self.load / self.cpus, 1.0)
+        tick = 100 * self.cpus
+        self.jiffies[0] += int(tick * busy * 0.7)
+        self.jiffies[2] += int(tick * busy * 0.3)
+        self.jiffies[3] += int(tick * (1 - busy))
+
+    def delay(self) -> float:
+        return max(self.rng.gauss(self.options.latency, self.options.jitter), 0.0)
+
+    # Output generators
+
+    def _meminfo(self) -> str:
+        available = int(self.mem_total_kb * (1 - self.mem_used))
+        return (
+            f"MemTotal: {self.mem_total_kb} kB\n"
+            f"MemFree: {available // 2} kB\n"
+            f"MemAvailable: {available} kB\n"
+            f"Buffers: {available // 20} kB\n"
+            f"Cached: {available // 3} kB\n"
+            f"SwapTotal: 2097152 kB\n"
+            f"SwapFree: 2000000 kB\n"
+        )
+
+    def _loadavg(self) -> str:
+        return f"{self.load:.2f} {self.load * 0.9:.2f} {self.load * 0.8:.2f} 1/{200 + len(self.containers) * 10} 12345"
+
+    def _uptime(self) -> float:
+        return time.time() - self.booted
+
+    def _statfs(self):
+        free = int(self.disk_blocks * (1 - self.disk_used))
+        return self.disk_blocks, free, int(free * 0.95), 4096
+
+    def _cpu_line(self) -> str:
+        return "cpu  " + " ".join(str(j) for j in self.jiffies) + "\n"
+
+    def facts(self) -> str:
+        return (
+            f"facts=1\nboot_id={self.boot_id}\ncpus={self.cpus}\nmem_total={self.mem_total_kb}\n"
+            f"kernel=6.1.0-bench\ndocker={'24.0.7' if self.containers else ''}\n"
+            "mount=/dev/sda1 / ext4\n"
+        )
+
+    def probe(self) -> str:
+        blocks, free, avail, bsize = self._statfs()
+        available = int(self.mem_total_kb * (1 - self.mem_used))
+        return (
+            f"v=2\nboot_id={self.boot_id}\nmem_available={available}\n"
+            f"load={self.load:.2f} {self.load * 0.9:.2f} {self.load * 0.8:.2f}\n"
+            f"disk={blocks} {free} {avail} {bsize}\n"
+        )
+
+    def snapshot(self, command: str) -> str:
+        blocks, free, avail, bsize = self._statfs()
+        out = f"@@boot\n{self.boot_id}\n"
+        out += "@@stat\n" + self._cpu_line()
+        out += "@@meminfo\n" + self._meminfo()
+        out += "@@loadavg\n" + self._loadavg() + "\n"
+        out += f"@@uptime\n{self._uptime():.2f} {self._uptime() * self.cpus * 0.9:.2f}\n"
+        out += f"@@statfs\n/ {blocks} {free} {avail} {bsize}\n"
+        out += "@@ps\n" + "\n".join(
+            f"{1000 + i} {self.rng.uniform(0, 50):.1f} {self.rng.uniform(0, 10):.1f} {name}"
+            for i, name in enumerate((self.containers or ["sshd"])[:5])
+        ) + "\n"
+        if "@@stat2" in command:
+            self._drift()
+            out += "@@stat2\n" + self._cpu_line()
+        return out
+
+    def sample_line(self) -> str:
+        blocks, free, avail, bsize = self._statfs()
+        available = int(self.mem_total_kb * (1 - self.mem_used))
+        rx = tx = int(self._uptime() * 1000)
+        return (
+            f"1 {self._uptime():.2f} {self.cpus} {self.mem_total_kb} {available} "
+            f"{self.load:.2f} {self.load * 0.9:.2f} {self.load * 0.8:.2f} "
+            + " ".join(str(j) for j in self.jiffies)
+            + f" {blocks} {free} {avail} {bsize} {rx} {tx}\n"
+        )
+
+    def free(self) -> str:
+        total = self.mem_total_kb // 1024
+        used = int(total * self.mem_used)
+        return (
+            "               total        used        free      shared  buff/cache   available\n"
+            f"Mem:          {total}Mi      {used}Mi      {(total - used) // 2}Mi        10Mi      "
+            f"{(total - used) // 3}Mi      {total - used}Mi\n"
+            "Swap:          2.0Gi       95Mi       1.9Gi\n"
+        )
+
+    def df(self) -> str:
+        blocks, free, avail, bsize = self._statfs()
+        size = blocks * bsize // 1024 ** 3
+        used = (blocks - free) * bsize // 1024 ** 3
+        return (
+            "Filesystem      Size  Used Avail Use% Mounted on\n"
+            f"/dev/sda1       {size}G  {used}G  {avail * bsize // 1024 ** 3}G  "
+            f"{int(self.disk_used * 100)}% /\n"
+        )
+
+    def docker_ps(self, command: str) -> str:
+        if "{{json .}}" in command:
+            return "".join(
+                json.dumps({
+                    "ID": f"{self.port or 0:06x}{i:06x}",
+                    "Names": name,
+                    "Image": name.rsplit("-", 1)[0] + ":latest",
+                    "Status": "Up 3 days",
+                    "State": "running",
+                    "Ports": "",
+                    "RunningFor": "3 days ago",
+                }) + "\n"
+                for i, name in enumerate(self.containers)
+            )
+        lines = ["NAMES\tSTATUS\tPORTS"]
+        lines += [f"{name}\tUp 3 days\t" for name in self.containers]
+        return "\n".join(lines) + "\n"
+
+    def respond(self, command: str):
+        """(stdout, exit_status) for a one-shot command."""
+        self._drift()
+        if command.startswith(PROBE_PREFIX):
+            return self.probe(), 0
+        if command.startswith(FACTS_PREFIX):
+            return self.facts(), 0
+        if command.startswith(SNAPSHOT_PREFIX):
+            return self.snapshot(command), 0
+        if command.startswith("docker ps"):
+            return self.docker_ps(command), 0
+        if command.startswith("free"):
+            return self.free(), 0
+        if command.startswith("df"):
+            return self.df(), 0
+        if command.startswith("nproc"):
+            return f"{self.cpus}\n", 0
+        if command == "uptime":
+            return f" 12:00:00 up {int(self._uptime() // 86400)} days,  load average: {self._loadavg()[:14]}\n", 0
+        if command == "cat /proc/loadavg":
+            return self._loadavg() + "\n", 0
+        if command == "cat /proc/sys/kernel/random/boot_id":
+            return self.boot_id + "\n", 0
+        if command.startswith("uname"):
+            return "6.1.0-bench\n", 0
+        return f"sh: 1: {command.split()[0] if command.split() else ''}: not found\n", 127
+
+    async def handle(self, process: asyncssh.SSHServerProcess):
+        stats = self.stats
+        stats.commands += 1
+        command = process.command or ""
+        try:
+            await asyncio.sleep(self.delay())
+            if self.rng.random() < self.options.drop_rate:
+                stats.drops += 1
+                process.channel.get_connection().abort()
+                return
+            if self.rng.random() < self.options.fail_rate:
+                stats.failures += 1
+                process.stderr.write("simulated failure\n")
+                process.exit(1)
+                return
+            if command.startswith(SAMPLER_PREFIX):
+                match = _SLEEP_RE.search(command)
+                interval = float(match.group(1)) if match else 10
+                while True:
+                    self._drift()
+                    process.stdout.write(self.sample_line())
+                    await asyncio.sleep(interval)
+            stdout, status = self.respond(command)
+            if status:
+                process.stderr.write(stdout)
+            else:
+                process.stdout.write(stdout)
+            process.exit(status)
+        except (asyncssh.Error, OSError):
+            pass
+
+
+class FakeServer(asyncssh.SSHServer):
+    def __init__(self, stats: FleetStats):
+        self.stats = stats
+
+    def connection_made(self, conn):
+        stats = self.stats
+        stats.connections += 1
+        stats.open_connections += 1
+        stats.peak_connections = max(stats.peak_connections, stats.open_connections)
+
+    def connection_lost(self, exc):
+        self.stats.open_connections -= 1
+
+
+class Fleet:
+    """N fake hosts listening on 127.0.0.1."""
+
+    def __init__(self, options: FleetOptions):
+        self.options = options
+        self.stats = FleetStats()
+        self.hosts = []
+        self.servers = []
+        self.client_key = None
+
+    async def start(self):
+        rng = random.Random(self.options.seed)
+        host_key = asyncssh.generate_private_key("ssh-ed25519")
+        self.client_key = asyncssh.generate_private_key("ssh-ed25519")
+        authorized = asyncssh.import_authorized_keys(
+            self.client_key.export_public_key().decode()
+        )
+        down = set(rng.sample(range(self.options.hosts), int(self.options.hosts * self.options.down)))
+        for i in range(self.options.hosts):
+            host = FakeHost(f"bench{i:04d}", self.options, self.stats, random.Random(rng.random()))
+            server = await asyncssh.listen(
+                "127.0.0.1", 0,
+                server_host_keys=[host_key],
+                authorized_client_keys=authorized,
+                process_factory=host.handle,
+                server_factory=lambda: FakeServer(self.stats),
+                encoding="utf-8",
+            )
+            host.port = server.sockets[0].getsockname()[1]
+            if i in down:
+                # Keep the port number but stop listening: connects are refused
+                server.close()
+                await server.wait_closed()
+            else:
+                self.servers.append(server)
+            self.hosts.append(host)
+
+    async def stop(self):
+        for server in self.servers:
+            server.close()
+        for server in self.servers:
+            await server.wait_closed()
+        self.servers = []
+
+    def hosts_config(self, check_interval: float = 5) -> dict:
+        key_b64 = base64.b64encode(self.client_key.export_private_key()).decode()
+        return {
+            "check_interval": check_interval,
+            "hosts": {
+                host.host_id: {
+                    "name": f"Bench {host.host_id[5:]}",
+                    "host": "127.0.0.1",
+                    "port": host.port,
+                    "user": "bench",
+                    "ssh_key_base64": key_b64,
+                    "monitor": True,
+                    "thresholds": {"ram": 90, "disk": 95, "cpu": 90},
+                }
+                for host in self.hosts
+            },
+            "default": self.hosts[0].host_id if self.hosts else None,
+        }
+
+    def write_hosts_json(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.hosts_config(), f, indent=2)
+
+
+def raise_fd_limit():
+    """Allow one socket per fake host (and client connection) on large fleets."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def serve_in_process(options: FleetOptions, hosts_path: str, conn):
+    """multiprocessing target: start the fleet, report, serve until told to stop."""
+    async def main():
+        raise_fd_limit()
+        fleet = Fleet(options)
+        started = time.perf_counter()
+        await fleet.start()
+        fleet.write_hosts_json(hosts_path)
+        conn.send({"hosts": len(fleet.hosts), "startup": time.perf_counter() - started})
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, conn.recv)
+        conn.send(vars(fleet.stats))
+        await fleet.stop()
+
+    asyncio.run(main())
+
+
+def add_fleet_arguments(parser: argparse.ArgumentParser):
+    defaults = FleetOptions()
+    parser.add_argument("--hosts", type=int, default=defaults.hosts, help="number of fake hosts")
+    parser.add_argument("--latency", type=float, default=defaults.latency, help="mean command latency (s)")
+    parser.add_argument("--jitter", type=float, default=defaults.jitter, help="latency standard deviation (s)")
+    parser.add_argument("--fail-rate", type=float, default=defaults.fail_rate, help="fraction of commands exiting 1")
+    parser.add_argument("--drop-rate", type=float, default=defaults.drop_rate, help="fraction of commands dropping the connection")
+    parser.add_argument("--down", type=float, default=defaults.down, help="fraction of hosts with a closed port")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="random seed for host state")
+
+
+def options_from_args(args) -> FleetOptions:
+    return FleetOptions(
+        hosts=args.hosts, latency=args.latency, jitter=args.jitter, fail_rate=args.fail_rate,
+        drop_rate=args.drop_rate, down=args.down, seed=args.seed,
+    )
+
+
+async def serve_forever(options: FleetOptions, out: str):
+    raise_fd_limit()
+    fleet = Fleet(options)
+    await fleet.start()
+    fleet.write_hosts_json(out)
+    print(f"{len(fleet.servers)} fake hosts listening on 127.0.0.1, wrote {out} (Ctrl-C to stop)")
+    try:
+        while True:
+            await asyncio.sleep(60)
+            s = fleet.stats
+            print(f"connections {s.open_connections} open / {s.connections} total, commands {s.commands}")
+    finally:
+        await fleet.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake SSH fleet on loopback")
+    add_fleet_arguments(parser)
+    parser.add_argument("--out", default="hosts.json", help="hosts.json to write")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve_forever(options_from_args(args), os.path.abspath(args.out)))
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,121 @@
 import os
+import json
+import time
 import asyncio
+import hashlib
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
+from utils.pool import ssh_pool
+from utils.telemetry import start_metrics_server
+
+# hosts.json hot reload needs the multi-host config
+try:
+    from utils.hosts import watch_hosts_config, HOSTS_CONFIG_PATH, HOSTS_RELOAD_INTERVAL
+    MULTI_HOST_MODE = os.path.exists(HOSTS_CONFIG_PATH)
+except ImportError:
+    MULTI_HOST_MODE = False
+
+STARTED = time.perf_counter()
 
 load_dotenv()
 
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 
+# Fingerprint of the last synced app-command tree; sync is skipped when unchanged
+COMMAND_SYNC_HASH_FILE = os.getenv("COMMAND_SYNC_HASH_FILE", "state/command_tree.sha256")
+
+
+def read_sync_hash():
+    try:
+        with open(COMMAND_SYNC_HASH_FILE) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def write_sync_hash(fingerprint: str):
+    try:
+        os.makedirs(os.path.dirname(COMMAND_SYNC_HASH_FILE) or ".", exist_ok=True)
+        with open(COMMAND_SYNC_HASH_FILE, "w") as f:
+            f.write(fingerprint)
+    except OSError as e:
+        print(f"Could not store command tree hash: {e}")
+
 class Bot(commands.Bot):
     def __init__(self):
         intents = discord.Intents.default()
         super().__init__(command_prefix="!", intents=intents)
+        self.hosts_watcher = None
+        self.metrics_runner = None
+
+    def command_tree_fingerprint(self) -> str:
+        """SHA-256 of the global app-command payload that sync would upload."""
+        payload = sorted(
+            (command.to_dict() for command in self.tree.get_commands()),
+            key=lambda command: command["name"],
+        )
+        data = json.dumps([self.application_id, payload], sort_keys=True, default=str)
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    async def load_cog(self, name: str):
+        started = time.perf_counter()
+        await self.load_extension(f"cogs.{name}")
+        print(f"Loaded cog: {name} ({(time.perf_counter() - started) * 1000:.0f} ms)")
 
     async def setup_hook(self):
-        # Load all cogs from cogs directory
-        for filename in os.listdir("./cogs"):
-            if filename.endswith(".py") and not filename.startswith("_"):
-                await self.load_extension(f"cogs.{filename[:-3]}")
-                print(f"Loaded cog: {filename[:-3]}")
-        
-        # Sync commands
-        await self.tree.sync()
-        print("Commands synced")
+        started = time.perf_counter()
+
+        try:
+            self.metrics_runner = await start_metrics_server()
+        except OSError as e:
+            print(f"Metrics endpoint disabled: {e}")
+
+        # Load all cogs from cogs directory concurrently
+        names = sorted(
+            filename[:-3] for filename in os.listdir("./cogs")
+            if filename.endswith(".py") and not filename.startswith("_")
+        )
+        results = await asyncio.gather(*(self.load_cog(name) for name in names), return_exceptions=True)
+        failed = []
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                print(f"Failed to load cog {name}: {result}")
+                failed.append(name)
+        cogs_done = time.perf_counter()
+
+        # Sync commands only when the command tree changed. A tree missing a
+        # failed cog would delete its slash commands from Discord, so never
+        # sync (or record the fingerprint) after a load failure.
+        fingerprint = self.command_tree_fingerprint()
+        if failed:
+            sync_note = f"not synced ({', '.join(failed)} failed to load)"
+        elif fingerprint != read_sync_hash():
+            await self.tree.sync()
+            write_sync_hash(fingerprint)
+            sync_note = "synced"
+        else:
+            sync_note = "unchanged, sync skipped"
+        sync_done = time.perf_counter()
+
+        print(
+            f"Startup: cogs {(cogs_done - started) * 1000:.0f} ms, "
+            f"commands {sync_note} {(sync_done - cogs_done) * 1000:.0f} ms"
+        )
+
+        if MULTI_HOST_MODE and HOSTS_RELOAD_INTERVAL > 0:
+            self.hosts_watcher = asyncio.create_task(watch_hosts_config())
+
+    async def close(self):
+        if self.hosts_watcher:
+            self.hosts_watcher.cancel()
+        if self.metrics_runner:
+            await self.metrics_runner.cleanup()
+        await ssh_pool.close_all()
+        await super().close()
 
     async def on_ready(self):
-        print(f"Bot is ready: {self.user}")
+        print(f"Bot is ready: {self.user} ({time.perf_counter() - STARTED:.1f}s after start)")
 
 bot = Bot()
 bot.run(DISCORD_TOKEN)
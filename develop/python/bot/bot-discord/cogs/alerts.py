@@ -1,12 +1,26 @@
 import os
+import time
+import asyncio
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
-from utils.ssh import run_ssh_command, SSH_HOST
+from utils.ssh import run_ssh_command, default_host_key, SSH_HOST
+from utils.probe import probe_host
+from utils.stream import metrics_stream
+from utils.timeseries import metrics_history, format_trend
+from utils.notifier import AlertQueue
+from utils.alert_state import AlertStateMachine, OK, ESCALATE, REPEAT, RECOVER, format_duration
+from utils.anomaly import AnomalyDetector, ANOMALY_ENABLED, SPIKE, format_baseline
+from utils.breaker import ssh_breakers, HostConnectError, HostUnavailableError, OPEN, CLOSED
+from utils.schedule import AdaptiveScheduler, headroom, default_max_interval, ALERT_SCHEDULER_TICK, ALERT_MIN_INTERVAL
+from utils.telemetry import check_loop_lag_seconds, check_cycle_seconds, host_check_seconds, check_timeouts_total
 
 # Try to import hosts manager for multi-host support
 try:
-    from utils.hosts import get_monitored_hosts, get_host_display_name, run_ssh_command_on_host, get_hosts_config
+    from utils.hosts import (
+        get_monitored_hosts, get_host_display_name, run_ssh_command_on_host, run_ssh_commands_on_host,
+        get_hosts_config, add_reload_listener, remove_reload_listener,
+    )
     MULTI_HOST_MODE = True
 except ImportError:
     MULTI_HOST_MODE = False
@@ -19,6 +33,24 @@ DEFAULT_DISK_THRESHOLD = int(os.getenv("ALERT_DISK_THRESHOLD", "85"))
 DEFAULT_CPU_THRESHOLD = int(os.getenv("ALERT_CPU_THRESHOLD", "80"))
 DEFAULT_CHECK_INTERVAL = int(os.getenv("ALERT_CHECK_INTERVAL", "5"))
 
+# Check cycle fan-out settings
+ALERT_MAX_CONCURRENCY = int(os.getenv("ALERT_MAX_CONCURRENCY", "10"))
+ALERT_HOST_TIMEOUT = float(os.getenv("ALERT_HOST_TIMEOUT", "30"))
+ALERT_CYCLE_TIMEOUT = float(os.getenv("ALERT_CYCLE_TIMEOUT", "120"))
+
+# Alert state machine settings
+ALERT_HYSTERESIS = float(os.getenv("ALERT_HYSTERESIS", "5"))
+ALERT_MIN_DURATION = float(os.getenv("ALERT_MIN_DURATION", "0"))
+ALERT_REPEAT_INTERVAL = float(os.getenv("ALERT_REPEAT_INTERVAL", "3600"))
+ALERT_CRITICAL_THRESHOLD = float(os.getenv("ALERT_CRITICAL_THRESHOLD", "95"))
+
+# metric -> (title, message prefix)
+METRIC_LABELS = {
+    "ram": ("RAM Usage", "RAM usage"),
+    "disk": ("Disk Usage", "Disk usage"),
+    "cpu": ("CPU Load", "CPU load"),
+}
+
 
 def get_check_interval():
     """Get check interval from JSON config or .env default."""
@@ -51,24 +83,120 @@ def get_host_thresholds(host_id: str = None):
     }
 
 
+def get_host_clear_thresholds(host_id: str = None):
+    """Get recovery thresholds from JSON "clear_thresholds" or threshold minus hysteresis."""
+    thresholds = get_host_thresholds(host_id)
+    clear = {}
+    if MULTI_HOST_MODE and host_id:
+        from utils.hosts import get_host_info
+        host_info = get_host_info(host_id)
+        if host_info:
+            clear = host_info.get("clear_thresholds", {})
+    return {
+        metric: clear.get(metric, threshold - ALERT_HYSTERESIS)
+        for metric, threshold in thresholds.items()
+    }
+
+
+def get_host_interval_bounds(host_id: str = None):
+    """(min, max) check interval in seconds from hosts.json or .env defaults."""
+    max_interval = default_max_interval(get_check_interval() * 60)
+    if MULTI_HOST_MODE and host_id:
+        from utils.hosts import get_host_info
+        host_info = get_host_info(host_id)
+        if host_info:
+            return (
+                float(host_info.get("check_interval_min", ALERT_MIN_INTERVAL)),
+                float(host_info.get("check_interval_max", max_interval)),
+            )
+    return ALERT_MIN_INTERVAL, max_interval
+
+
 class Alerts(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        check_interval = get_check_interval()
-        self.check_system.change_interval(minutes=check_interval)
+        self.alert_queue = AlertQueue(bot, ALERTS_CHANNEL_ID)
+        self.alert_states = AlertStateMachine(ALERT_MIN_DURATION, ALERT_REPEAT_INTERVAL)
+        # Streaming baselines for spikes and time-to-full below the static thresholds
+        self.anomalies = AnomalyDetector()
+        self.next_scheduled = None
+        # Per-host adaptive intervals; the loop itself only ticks to find due hosts
+        self.scheduler = AdaptiveScheduler(get_check_interval() * 60)
+        self.check_semaphore = asyncio.Semaphore(ALERT_MAX_CONCURRENCY)
+        self.inflight = set()
+        self.circuit_alerts = set()
+        self.check_system.change_interval(seconds=ALERT_SCHEDULER_TICK)
         self.check_system.start()
 
+    async def cog_load(self):
+        if ALERTS_CHANNEL_ID:
+            self.alert_queue.start()
+        ssh_breakers.add_listener(self.on_circuit_change)
+        if MULTI_HOST_MODE:
+            add_reload_listener(self.on_hosts_reload)
+
     def cog_unload(self):
         self.check_system.cancel()
+        for task in list(self.inflight):
+            task.cancel()
+        self.alert_queue.stop()
+        ssh_breakers.remove_listener(self.on_circuit_change)
+        if MULTI_HOST_MODE:
+            remove_reload_listener(self.on_hosts_reload)
+
+    def on_hosts_reload(self, diff):
+        """Apply a hosts.json reload: forget removed hosts, reschedule on interval change."""
+        for host_id in diff.removed:
+            self.alert_states.drop_host(host_id)
+            self.scheduler.drop_host(host_id)
+            self.anomalies.drop_host(host_id)
+            metrics_history.drop_host(host_id)
+        if diff.check_interval_changed:
+            check_interval = get_check_interval()
+            self.scheduler.set_base_interval(check_interval * 60)
+            print(f"Alert check interval changed to {check_interval} minutes")
+
+    def on_circuit_change(self, host: str, old: str, new: str, breaker):
+        """One alert when a monitored host becomes unreachable and one when it is back."""
+        try:
+            # Pool keys also cover hosts only touched by HostSelect or /fleet-containers
+            if host != default_host_key() and not (MULTI_HOST_MODE and host in get_monitored_hosts()):
+                return
+            name = get_host_display_name(host) if MULTI_HOST_MODE else SSH_HOST
+        except Exception:
+            return
+        if new == OPEN and old == CLOSED:
+            self._circuit_alert(
+                "critical",
+                "Host Unreachable",
+                f"SSH connections are failing ({breaker.last_error}).\n"
+                f"Checks fail fast while the host is down; reconnects are probed with backoff.",
+                name
+            )
+        elif new == CLOSED:
+            down = time.time() - breaker.down_since if breaker.down_since else 0
+            self._circuit_alert(
+                "info",
+                "Host Reachable",
+                f"SSH connection restored after {format_duration(down)}",
+                name
+            )
+
+    def _circuit_alert(self, *args):
+        # Breaker listeners are sync; keep the task referenced until it is queued
+        task = asyncio.create_task(self.send_alert(*args))
+        self.circuit_alerts.add(task)
+        task.add_done_callback(self._circuit_alert_done)
+
+    def _circuit_alert_done(self, task):
+        self.circuit_alerts.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"Failed to queue circuit alert: {task.exception()}")
 
     async def send_alert(self, level: str, title: str, message: str, host_name: str = None):
-        """Send alert to alerts channel."""
+        """Queue alert for the alerts channel (never waits on Discord)."""
         if not ALERTS_CHANNEL_ID:
             return
-        
-        channel = self.bot.get_channel(ALERTS_CHANNEL_ID)
-        if not channel:
-            return
 
         emoji_map = {
             "info": "🟢",
@@ -98,62 +226,74 @@ class Alerts(commands.Cog):
         embed.add_field(name="Severity", value=level.upper(), inline=True)
         embed.set_footer(text="DevOps Bot Alert System")
 
-        await channel.send(embed=embed)
+        self.alert_queue.enqueue(level, embed)
 
     async def check_single_host(self, host_id: str = None, host_name: str = None):
         """Check a single host for alerts."""
         try:
             # Get thresholds for this host
             thresholds = get_host_thresholds(host_id)
-            ram_threshold = thresholds["ram"]
-            disk_threshold = thresholds["disk"]
-            cpu_threshold = thresholds["cpu"]
+            clear_thresholds = get_host_clear_thresholds(host_id)
 
             # Determine which SSH function to use
             if MULTI_HOST_MODE and host_id:
                 ssh_cmd = lambda cmd: run_ssh_command_on_host(host_id, cmd)
+                ssh_batch = lambda cmds: run_ssh_commands_on_host(host_id, cmds)
                 display_name = host_name or get_host_display_name(host_id)
             else:
                 ssh_cmd = run_ssh_command
+                ssh_batch = None
                 display_name = SSH_HOST
 
-            # Check RAM
-            ram_output = await ssh_cmd("free | grep Mem | awk '{print $3/$2 * 100}'")
-            ram_usage = float(ram_output.strip())
-            if ram_usage > ram_threshold:
-                await self.send_alert(
-                    "critical" if ram_usage > 95 else "warning",
-                    "High RAM Usage",
-                    f"RAM usage is at **{ram_usage:.1f}%** (threshold: {ram_threshold}%)",
-                    display_name
-                )
+            history_id = host_id or SSH_HOST
 
-            # Check Disk
-            disk_output = await ssh_cmd("df / | tail -1 | awk '{print $5}' | sed 's/%//'")
-            disk_usage = float(disk_output.strip())
-            if disk_usage > disk_threshold:
-                await self.send_alert(
-                    "critical" if disk_usage > 95 else "warning",
-                    "High Disk Usage",
-                    f"Disk usage is at **{disk_usage:.1f}%** (threshold: {disk_threshold}%)",
-                    display_name
-                )
+            # Prefer a fresh live stream sample, else probe the volatile
+            # counters in one round trip (static facts are cached)
+            health = metrics_stream.latest(host_id) if host_id else None
+            if health is None:
+                health = await probe_host(history_id, ssh_cmd, ssh_batch)
+                metrics_history.record_health(history_id, health)
 
-            # Check CPU (1min load average vs cores)
-            cpu_output = await ssh_cmd("nproc && cat /proc/loadavg | awk '{print $1}'")
-            lines = cpu_output.strip().split('\n')
-            cores = int(lines[0])
-            load = float(lines[1])
-            cpu_percent = (load / cores) * 100
-            if cpu_percent > cpu_threshold:
-                await self.send_alert(
-                    "critical" if cpu_percent > 95 else "warning",
-                    "High CPU Load",
-                    f"CPU load is at **{cpu_percent:.1f}%** (threshold: {cpu_threshold}%)",
-                    display_name
+            # Feed each metric through the state machine, alert on transitions
+            values = {
+                "ram": health.ram_percent,
+                "disk": health.disk_percent,
+                "cpu": health.cpu_percent,
+            }
+            alerting = False
+            for metric, value in values.items():
+                event = self.alert_states.evaluate(
+                    (history_id, metric),
+                    value,
+                    thresholds[metric],
+                    clear_thresholds[metric],
+                    ALERT_CRITICAL_THRESHOLD
                 )
+                if event:
+                    await self.send_metric_alert(
+                        event, metric, thresholds[metric], clear_thresholds[metric],
+                        history_id, display_name
+                    )
+                if self.alert_states.get((history_id, metric)).state != OK:
+                    alerting = True
 
+            # Deviations from each metric's own baseline, one alert per episode
+            if ANOMALY_ENABLED:
+                # Unrounded disk usage: whole-percent steps would fake a growth rate
+                for event in self.anomalies.observe(history_id, dict(values, disk=health.disk_usage)):
+                    await self.send_anomaly_alert(event, display_name)
+
+            # Check again sooner near a threshold, back off while stable
+            min_interval, max_interval = get_host_interval_bounds(host_id)
+            self.scheduler.update(
+                history_id, headroom(values, thresholds), alerting, min_interval, max_interval
+            )
+
+        except (HostConnectError, HostUnavailableError):
+            # Reported once per outage by on_circuit_change
+            self.scheduler.reset(host_id or SSH_HOST, *get_host_interval_bounds(host_id))
         except Exception as e:
+            self.scheduler.reset(host_id or SSH_HOST, *get_host_interval_bounds(host_id))
             await self.send_alert(
                 "critical", 
                 "Monitoring Error", 
@@ -161,17 +301,121 @@ class Alerts(commands.Cog):
                 display_name if 'display_name' in locals() else None
             )
 
-    @tasks.loop(minutes=1)  # Default, will be changed in __init__
+    async def send_metric_alert(self, event, metric: str, threshold: float, clear: float,
+                                history_id: str, display_name: str):
+        """Send alert for a state machine event."""
+        title, prefix = METRIC_LABELS[metric]
+        if event.kind == RECOVER:
+            await self.send_alert(
+                "info",
+                f"{title} Recovered",
+                f"{prefix} is back to **{event.value:.1f}%** (clear: {clear:.0f}%) "
+                f"after {format_duration(event.duration)}, peak {event.peak:.1f}%",
+                display_name
+            )
+            return
+
+        message = f"{prefix} is at **{event.value:.1f}%** (threshold: {threshold}%)"
+        if event.kind == ESCALATE:
+            message += f"\nEscalated to critical after {format_duration(event.duration)}"
+        elif event.kind == REPEAT:
+            message += f"\nOngoing for {format_duration(event.duration)}, peak {event.peak:.1f}%"
+        trend = format_trend(metrics_history.summary(history_id, metric))
+        if trend:
+            message += f"\n{trend}"
+        await self.send_alert(event.level, f"High {title}", message, display_name)
+
+    async def send_anomaly_alert(self, event, display_name: str):
+        """Send alert for a baseline deviation or a time-to-full projection."""
+        title, prefix = METRIC_LABELS[event.metric]
+        if event.kind == SPIKE:
+            sigma = f"{event.sigma:.1f}σ" if event.std > 0 else "far"
+            await self.send_alert(
+                event.level,
+                f"{title} Anomaly",
+                f"{prefix} **{event.value:.1f}%** is {sigma} above baseline "
+                f"({event.mean:.1f}% ±{event.std:.1f})",
+                display_name
+            )
+            return
+
+        await self.send_alert(
+            event.level,
+            f"{title} Trend",
+            f"{prefix} reaches 100% in **~{format_duration(event.eta)}** at the current rate\n"
+            f"Now {event.value:.1f}%, growing {event.rate * 3600:.2f}%/h",
+            display_name
+        )
+
+    async def check_host_bounded(self, semaphore: asyncio.Semaphore, host_id: str = None):
+        """Check one host under the concurrency limit and per-host timeout."""
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(self.check_single_host(host_id), ALERT_HOST_TIMEOUT)
+            except asyncio.TimeoutError:
+                check_timeouts_total.inc(host=host_id or SSH_HOST)
+                await self.send_alert(
+                    "critical",
+                    "Monitoring Error",
+                    f"Host check timed out after {ALERT_HOST_TIMEOUT:.0f}s",
+                    get_host_display_name(host_id) if host_id else SSH_HOST
+                )
+            finally:
+                host_check_seconds.observe(time.perf_counter() - started, host=host_id or SSH_HOST)
+                self.scheduler.release(host_id or SSH_HOST)
+
+    @tasks.loop(seconds=1)  # Default, will be changed in __init__
     async def check_system(self):
-        """Periodic system health check."""
-        if MULTI_HOST_MODE:
-            # Check all monitored hosts
-            monitored_hosts = get_monitored_hosts()
-            for host_id in monitored_hosts:
-                await self.check_single_host(host_id)
-        else:
-            # Legacy single-host mode
-            await self.check_single_host()
+        """Periodic system health check of the hosts that are due."""
+        if self.next_scheduled:
+            lag = (discord.utils.utcnow() - self.next_scheduled).total_seconds()
+            check_loop_lag_seconds.observe(max(lag, 0.0))
+        self.next_scheduled = self.check_system.next_iteration
+
+        # Start due hosts in the background; each host runs on its own phase,
+        # so checks form a continuous stream rather than a burst per interval
+        hosts = get_monitored_hosts() if MULTI_HOST_MODE else [SSH_HOST]
+        for host in self.scheduler.due(hosts):
+            task = asyncio.create_task(
+                self.check_host_bounded(self.check_semaphore, host if MULTI_HOST_MODE else None)
+            )
+            self.inflight.add(task)
+            task.add_done_callback(self.inflight.discard)
+
+    async def run_check_cycle(self):
+        """Check all monitored hosts once (manual /alerts-check)."""
+        started = time.monotonic()
+        hosts = get_monitored_hosts() if MULTI_HOST_MODE else [SSH_HOST]
+        # Shares the loop's concurrency limit; hosts with a scheduled check
+        # in flight are skipped rather than checked twice at the same time
+        claimed = self.scheduler.claim(hosts)
+        checks = [
+            asyncio.create_task(
+                self.check_host_bounded(self.check_semaphore, host if MULTI_HOST_MODE else None)
+            )
+            for host in claimed
+        ]
+        for task in checks:
+            self.inflight.add(task)
+            task.add_done_callback(self.inflight.discard)
+        timed_out = 0
+        if checks:
+            done, pending = await asyncio.wait(checks, timeout=ALERT_CYCLE_TIMEOUT)
+            timed_out = len(pending)
+            for task in pending:
+                task.cancel()
+            if timed_out:
+                check_timeouts_total.inc(timed_out, host="")
+        skipped = len(hosts) - len(claimed)
+
+        elapsed = time.monotonic() - started
+        check_cycle_seconds.observe(elapsed)
+        print(
+            f"Check cycle: {len(claimed)} hosts in {elapsed:.2f}s"
+            + (f", {skipped} already being checked" if skipped else "")
+            + (f", {timed_out} cut by cycle timeout" if timed_out else "")
+        )
 
     @check_system.before_loop
     async def before_check(self):
@@ -181,14 +425,45 @@ class Alerts(commands.Cog):
     async def alerts_test(self, interaction: discord.Interaction):
         await interaction.response.defer()
         await self.send_alert("info", "Test Alert", "This is a test alert from DevOps Bot")
-        await interaction.followup.send("✅ Test alert sent to alerts channel")
+        await interaction.followup.send("✅ Test alert queued for alerts channel")
 
     @app_commands.command(name="alerts-check", description="Run system check now")
     async def alerts_check(self, interaction: discord.Interaction):
         await interaction.response.defer()
-        await self.check_system()
+        await self.run_check_cycle()
         await interaction.followup.send("✅ System check completed")
 
+    @app_commands.command(name="alerts-schedule", description="Adaptive check interval per host")
+    async def alerts_schedule(self, interaction: discord.Interaction):
+        now = time.monotonic()
+        lines = []
+        for host, schedule in sorted(self.scheduler.hosts.items()):
+            name = get_host_display_name(host) if MULTI_HOST_MODE else host
+            room = f"{schedule.headroom * 100:.0f}% headroom" if schedule.headroom is not None else "not checked yet"
+            lines.append(
+                f"{name}: every {schedule.interval:.0f}s, next in "
+                f"{max(schedule.next_due - now, 0):.0f}s ({room})"
+            )
+        if not lines:
+            await interaction.response.send_message("No hosts scheduled yet", ephemeral=True)
+            return
+        await interaction.response.send_message("**Check schedule:**\n```\n" + "\n".join(lines) + "\n```")
+
+    @app_commands.command(name="alerts-baseline", description="Learned baseline and trend per host metric")
+    async def alerts_baseline(self, interaction: discord.Interaction):
+        lines = []
+        for (host, metric), baseline in sorted(self.anomalies.items()):
+            name = get_host_display_name(host) if MULTI_HOST_MODE else host
+            lines.append(f"{name[:16]:<16} {metric:<4} {format_baseline(metric, baseline)}")
+        if not lines:
+            await interaction.response.send_message("No baselines learned yet", ephemeral=True)
+            return
+        # Keep within one message
+        text = "\n".join(lines)
+        if len(text) > 1800:
+            text = text[:1800].rsplit("\n", 1)[0] + "\n..."
+        await interaction.response.send_message("**Metric baselines (mean ±σ, trend):**\n```\n" + text + "\n```")
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Alerts(bot))
@@ -1,14 +1,74 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from utils.ssh import run_ssh_command, SSH_HOST
-from utils.views import QuickActionsView
+from utils.ssh import run_ssh_command, SSH_HOST, default_host_key, connect_default_host
+from utils.views import QuickActionsView, LogPagerView, LogFollowView, FleetContainersView
+from utils.inventory import fleet_inventory, SORT_KEYS, STATUS_FILTERS
+from utils.logs import logs_command, LOGS_TAIL
+from utils.streaming import OutputReader, dedicated
+from utils.docker_stats import (
+    docker_stats as stats_collector, DOCKER_STATS_ENABLED, format_stats_table, format_history,
+)
+
+# Multi-host mode also streams stats from monitored hosts
+try:
+    from utils.hosts import (
+        get_monitored_hosts, connect_to_host, add_reload_listener, remove_reload_listener,
+        get_host_list, get_host_display_name, run_ssh_command_on_host,
+    )
+    MULTI_HOST_MODE = True
+except ImportError:
+    MULTI_HOST_MODE = False
 
 
 class DockerMonitor(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    def wanted_hosts(self) -> dict:
+        """host key -> connect callable for every host with a stats collector."""
+        hosts = {default_host_key(): connect_default_host}
+        if MULTI_HOST_MODE:
+            for host_id in get_monitored_hosts():
+                hosts.setdefault(host_id, lambda h=host_id: connect_to_host(h))
+        return hosts
+
+    async def cog_load(self):
+        if not DOCKER_STATS_ENABLED:
+            return
+        try:
+            hosts = self.wanted_hosts()
+        except Exception as e:
+            print(f"Docker stats collector disabled: {e}")
+            return
+        for host, connect in hosts.items():
+            stats_collector.start_host(host, connect)
+        if MULTI_HOST_MODE:
+            add_reload_listener(self.on_hosts_reload)
+        print(f"Docker stats collector started for {len(hosts)} hosts")
+
+    async def cog_unload(self):
+        if MULTI_HOST_MODE:
+            remove_reload_listener(self.on_hosts_reload)
+        stats_collector.stop_all()
+
+    def fleet_hosts(self) -> dict:
+        """host key -> run(command) for every configured host."""
+        if not MULTI_HOST_MODE:
+            return {SSH_HOST: run_ssh_command}
+        return {
+            host_id: lambda command, h=host_id: run_ssh_command_on_host(h, command)
+            for host_id in get_host_list()
+        }
+
+    def on_hosts_reload(self, diff):
+        hosts = self.wanted_hosts()
+        for host in list(stats_collector.streams):
+            if host not in hosts or host in diff.reconnect:
+                stats_collector.stop_host(host)
+        for host, connect in hosts.items():
+            stats_collector.start_host(host, connect)
+
     @app_commands.command(name="containers", description="List running containers")
     async def containers(self, interaction: discord.Interaction):
         await interaction.response.defer()
@@ -21,8 +81,67 @@ class DockerMonitor(commands.Cog):
         except Exception as e:
             await interaction.followup.send(f"Error: {e}")
 
+    @app_commands.command(name="fleet-containers", description="Containers on every host, sortable and filterable")
+    @app_commands.describe(
+        name="Only containers whose name contains this",
+        status="Only running, stopped or unhealthy containers",
+        host="Only this host (id or name)",
+        sort="Sort order",
+    )
+    @app_commands.choices(
+        status=[app_commands.Choice(name=f, value=f) for f in STATUS_FILTERS],
+        sort=[app_commands.Choice(name=k, value=k) for k in SORT_KEYS],
+    )
+    async def fleet_containers(self, interaction: discord.Interaction, name: str = None,
+                               status: str = "all", host: str = None, sort: str = "name"):
+        hosts = self.fleet_hosts()
+        host_names = {h: get_host_display_name(h) for h in hosts} if MULTI_HOST_MODE else {}
+        if host:
+            match = [h for h in hosts if host.lower() in (h.lower(), host_names.get(h, h).lower())]
+            if not match:
+                await interaction.response.send_message(f"Unknown host: {host}", ephemeral=True)
+                return
+            host = match[0]
+
+        def make_view(inventory):
+            return FleetContainersView(
+                inventory, lambda: fleet_inventory.get(hosts, force=True), host_names,
+                name=name, status=status, host=host, sort=sort,
+            )
+
+        # Repeated views within the TTL answer from the last inventory
+        inventory = fleet_inventory.fresh(hosts)
+        if inventory:
+            view = make_view(inventory)
+            await interaction.response.send_message(view.render(), view=view)
+            return
+
+        await interaction.response.defer()
+        try:
+            view = make_view(await fleet_inventory.get(hosts))
+            await interaction.followup.send(view.render(), view=view)
+        except Exception as e:
+            await interaction.followup.send(f"Error: {e}")
+
     @app_commands.command(name="docker-stats", description="Container resource usage")
-    async def docker_stats(self, interaction: discord.Interaction):
+    @app_commands.describe(container="Show recent CPU/memory history for this container")
+    async def docker_stats(self, interaction: discord.Interaction, container: str = None):
+        # Answer instantly from the background collector when it has fresh data
+        latest = stats_collector.latest(default_host_key())
+        if latest:
+            containers, age = latest
+            if container:
+                points = stats_collector.history(default_host_key(), container)
+                body = format_history(points)
+            else:
+                body = format_stats_table(containers)[:1900]
+            title = container or "Docker stats"
+            await interaction.response.send_message(
+                f"**{title} on {SSH_HOST}:** _live, {age:.0f}s ago_\n```\n{body}\n```",
+                view=QuickActionsView("containers")
+            )
+            return
+
         await interaction.response.defer()
         try:
             output = await run_ssh_command("docker stats --no-stream --format 'table {{.Name}}\t{{.CPUPerc}}\t{{.MemUsage}}'")
@@ -33,20 +152,46 @@ class DockerMonitor(commands.Cog):
         except Exception as e:
             await interaction.followup.send(f"Error: {e}")
 
-    @app_commands.command(name="docker-logs", description="Container logs (last 20 lines)")
-    @app_commands.describe(container="Container name")
-    async def docker_logs(self, interaction: discord.Interaction, container: str):
+    @app_commands.command(name="docker-logs", description="Container logs, paginated")
+    @app_commands.describe(
+        container="Container name",
+        since="Only logs newer than this (e.g. 10m, 2h, 2024-01-01T00:00:00)",
+        grep="Only lines matching this pattern (case-insensitive regex)",
+        follow="Follow new log lines in one updating message",
+    )
+    async def docker_logs(self, interaction: discord.Interaction, container: str,
+                          since: str = None, grep: str = None, follow: bool = False):
         await interaction.response.defer()
+        reader = None
         try:
-            output = await run_ssh_command(f"docker logs --tail 20 {container}")
-            if len(output) > 1900:
-                output = output[-1900:]
-            await interaction.followup.send(
-                f"**Logs for {container}:**\n```\n{output}\n```",
-                view=QuickActionsView("containers")
-            )
+            command = logs_command(container, since=since, grep=grep, follow=follow,
+                                   tail=20 if follow else LOGS_TAIL)
+            reader = OutputReader(dedicated(connect_default_host), command)
+            await reader.open()
+            title = f"Logs for {container}" + (f" matching `{grep}`" if grep else "")
+
+            if follow:
+                view = LogFollowView(reader, title)
+                message = await interaction.followup.send(view.render(), view=view, wait=True)
+                reader = None
+                await view.run(message)
+                return
+
+            first_page = await reader.read_page()
+            if first_page is None:
+                await interaction.followup.send(f"**{title}:** no output")
+                return
+            view = LogPagerView(reader, title, first_page)
+            if view.next_page.disabled:
+                await interaction.followup.send(view.render(), view=QuickActionsView("containers"))
+                return
+            await interaction.followup.send(view.render(), view=view)
+            reader = None
         except Exception as e:
             await interaction.followup.send(f"Error: {e}")
+        finally:
+            if reader:
+                await reader.close()
 
 
 async def setup(bot: commands.Bot):
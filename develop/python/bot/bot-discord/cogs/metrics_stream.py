@@ -0,0 +1,76 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+from utils.stream import metrics_stream, METRICS_STREAM_ENABLED, METRICS_STREAM_INTERVAL
+from utils.timeseries import metrics_history
+
+# Streaming needs the multi-host config for per-host credentials
+try:
+    from utils.hosts import (
+        get_monitored_hosts, get_default_host, get_host_display_name, connect_to_host,
+        add_reload_listener, remove_reload_listener,
+    )
+    MULTI_HOST_MODE = True
+except ImportError:
+    MULTI_HOST_MODE = False
+
+
+class MetricsStream(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        if not (METRICS_STREAM_ENABLED and MULTI_HOST_MODE):
+            return
+        try:
+            host_ids = set(get_monitored_hosts())
+            host_ids.add(get_default_host())
+        except Exception as e:
+            print(f"Metrics stream disabled: {e}")
+            return
+        metrics_stream.add_listener(metrics_history.record_health)
+        for host_id in host_ids:
+            metrics_stream.start_host(host_id, lambda h=host_id: connect_to_host(h))
+        add_reload_listener(self.on_hosts_reload)
+        print(f"Metrics stream started for {len(host_ids)} hosts every {METRICS_STREAM_INTERVAL}s")
+
+    async def cog_unload(self):
+        if MULTI_HOST_MODE:
+            remove_reload_listener(self.on_hosts_reload)
+        metrics_stream.stop_all()
+
+    def on_hosts_reload(self, diff):
+        """Restart streams of reconnected hosts and match streams to the monitored set."""
+        wanted = set(get_monitored_hosts())
+        wanted.add(get_default_host())
+        for host_id in list(metrics_stream.streams):
+            if host_id not in wanted or host_id in diff.reconnect:
+                metrics_stream.stop_host(host_id)
+        for host_id in wanted - set(metrics_stream.streams):
+            metrics_stream.start_host(host_id, lambda h=host_id: connect_to_host(h))
+
+    @app_commands.command(name="stream-status", description="Live metrics stream status per host")
+    async def stream_status(self, interaction: discord.Interaction):
+        if not metrics_stream.streams:
+            await interaction.response.send_message("Metrics stream is not enabled", ephemeral=True)
+            return
+
+        lines = []
+        for host_id, stream in sorted(metrics_stream.streams.items()):
+            name = get_host_display_name(host_id)
+            if stream.latest:
+                line = f"{name}: last sample {stream.latest.age:.0f}s ago"
+            else:
+                line = f"{name}: no samples yet"
+            if stream.reconnects:
+                line += f", {stream.reconnects} reconnects"
+            if stream.stopped:
+                line += ", stopped"
+            if stream.last_error:
+                line += f" ({stream.last_error})"
+            lines.append(line)
+        await interaction.response.send_message("**Metrics stream:**\n```\n" + "\n".join(lines) + "\n```")
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(MetricsStream(bot))
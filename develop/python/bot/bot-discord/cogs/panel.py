@@ -1,80 +1,74 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from utils.ssh import run_ssh_command, SSH_HOST
-from utils.views import QuickActionsView
+from utils.ssh import SSH_HOST
+from utils.views import (
+    QuickActionsView, send_formatted, snapshot_formatted,
+    format_sample_memory, format_sample_cpu, format_sample_disk,
+)
+from utils.stream import metrics_stream
 
 # Try to import hosts manager for multi-host support
 try:
-    from utils.hosts import get_host_list, get_host_display_name, run_ssh_command_on_host
+    from utils.hosts import get_host_list, get_host_display_name, get_default_host
     MULTI_HOST_MODE = True
 except ImportError:
     MULTI_HOST_MODE = False
 
 
+def get_stream_sample():
+    """Fresh live stream sample for the default host, if streaming is on."""
+    if not MULTI_HOST_MODE or not metrics_stream.streams:
+        return None
+    try:
+        return metrics_stream.latest(get_default_host())
+    except Exception:
+        return None
+
+
+async def send_stream_sample(interaction: discord.Interaction, label: str, formatter, command_type: str) -> bool:
+    """Answer from the live stream without SSH. Returns False if no fresh sample."""
+    sample = get_stream_sample()
+    if not sample:
+        return False
+    await interaction.response.send_message(
+        f"**{label} on {SSH_HOST}** (live, {sample.age:.0f}s ago)\n{formatter(sample)}",
+        view=QuickActionsView(command_type, True)
+    )
+    return True
+
+
 class MonitoringView(discord.ui.View):
+    """Panel buttons answer from the background snapshot, then the live stream, then SSH."""
+
     def __init__(self):
         super().__init__(timeout=None)
 
     @discord.ui.button(label="Memory", style=discord.ButtonStyle.primary, emoji="🧠", custom_id="btn_memory")
     async def memory_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer()
-        try:
-            output = await run_ssh_command("free -mh")
-            await interaction.followup.send(
-                f"**Memory on {SSH_HOST}:**\n```\n{output}\n```",
-                view=QuickActionsView("memory", False)
-            )
-        except Exception as e:
-            await interaction.followup.send(f"Error: {e}", ephemeral=True)
+        if not snapshot_formatted("memory") and await send_stream_sample(interaction, "Memory", format_sample_memory, "memory"):
+            return
+        await send_formatted(interaction, "memory", ephemeral_errors=True)
 
     @discord.ui.button(label="CPU", style=discord.ButtonStyle.primary, emoji="⚡", custom_id="btn_cpu")
     async def cpu_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer()
-        try:
-            output = await run_ssh_command("top -bn1 | head -20")
-            await interaction.followup.send(
-                f"**CPU on {SSH_HOST}:**\n```\n{output}\n```",
-                view=QuickActionsView("cpu", False)
-            )
-        except Exception as e:
-            await interaction.followup.send(f"Error: {e}", ephemeral=True)
+        if not snapshot_formatted("cpu") and await send_stream_sample(interaction, "CPU", format_sample_cpu, "cpu"):
+            return
+        await send_formatted(interaction, "cpu", ephemeral_errors=True)
 
     @discord.ui.button(label="Disk", style=discord.ButtonStyle.secondary, emoji="💾", custom_id="btn_disk")
     async def disk_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer()
-        try:
-            output = await run_ssh_command("df -h")
-            await interaction.followup.send(
-                f"**Disk on {SSH_HOST}:**\n```\n{output}\n```",
-                view=QuickActionsView("disk", False)
-            )
-        except Exception as e:
-            await interaction.followup.send(f"Error: {e}", ephemeral=True)
+        if not snapshot_formatted("disk") and await send_stream_sample(interaction, "Disk", format_sample_disk, "disk"):
+            return
+        await send_formatted(interaction, "disk", ephemeral_errors=True)
 
     @discord.ui.button(label="Uptime", style=discord.ButtonStyle.secondary, emoji="⏱️", custom_id="btn_uptime")
     async def uptime_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer()
-        try:
-            output = await run_ssh_command("uptime")
-            await interaction.followup.send(
-                f"**Uptime on {SSH_HOST}:**\n```\n{output}\n```",
-                view=QuickActionsView("uptime", False)
-            )
-        except Exception as e:
-            await interaction.followup.send(f"Error: {e}", ephemeral=True)
+        await send_formatted(interaction, "uptime", ephemeral_errors=True)
 
     @discord.ui.button(label="Containers", style=discord.ButtonStyle.success, emoji="🐳", custom_id="btn_containers")
     async def containers_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer()
-        try:
-            output = await run_ssh_command("docker ps --format 'table {{.Names}}\t{{.Status}}\t{{.Ports}}'")
-            await interaction.followup.send(
-                f"**Containers on {SSH_HOST}:**\n```\n{output}\n```",
-                view=QuickActionsView("containers", False)
-            )
-        except Exception as e:
-            await interaction.followup.send(f"Error: {e}", ephemeral=True)
+        await send_formatted(interaction, "containers", ephemeral_errors=True)
 
 
 class Panel(commands.Cog):
@@ -1,15 +1,22 @@
+import re
+import shlex
 import discord
 from discord import app_commands
 from discord.ext import commands
-from utils.ssh import SSH_HOST
+from utils.ssh import default_host_key, connect_default_host
+from utils.pool import ssh_pool
+from utils.streaming import OutputReader, pooled
+from utils.views import StreamingView
 
-# Import for multi-host support
-try:
-    from utils.hosts import run_ssh_command_on_host, get_default_host
-    MULTI_HOST_MODE = True
-except ImportError:
-    MULTI_HOST_MODE = False
-    from utils.ssh import run_ssh_command
+# Hostname, IPv4 or IPv6 address; must not start with "-" (ping option)
+PING_TARGET = re.compile(r"^[A-Za-z0-9][A-Za-z0-9.:-]{0,252}$")
+
+
+def ping_command(target: str) -> str:
+    """Fixed-count ping of target; raises ValueError for anything but a host."""
+    if not PING_TARGET.match(target):
+        raise ValueError(f"Invalid ping target: {target!r}")
+    return f"ping -c 4 -- {shlex.quote(target)}"
 
 
 class Ping(commands.Cog):
@@ -19,28 +26,43 @@ class Ping(commands.Cog):
     @app_commands.command(name="ping", description="Ping a host")
     @app_commands.describe(target="Target host to ping")
     async def ping(self, interaction: discord.Interaction, target: str):
+        try:
+            command = ping_command(target)
+        except ValueError as e:
+            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+            return
         await interaction.response.defer()
+        reader = None
         try:
-            # Use asyncssh directly without check=True
-            import asyncssh
-            from utils.hosts import get_host_info, get_ssh_key, get_default_host
-            
-            host_id = get_default_host()
-            host_info = get_host_info(host_id)
-            ssh_key = get_ssh_key(host_id)
-            
-            async with asyncssh.connect(
-                host_info["host"],
-                username=host_info["user"],
-                client_keys=[ssh_key],
-                known_hosts=None
-            ) as conn:
-                result = await conn.run(f"ping -c 4 {target}", check=False)
-                output = result.stdout + result.stderr
-                
-            await interaction.followup.send(f"**Ping to {target}:**\n```\n{output}\n```")
+            # Stream replies as they arrive over a pooled connection
+            reader = OutputReader(pooled(default_host_key(), connect_default_host), command)
+            await reader.open()
+            view = StreamingView(reader, f"Ping to {target}")
+            message = await interaction.followup.send(view.render(), view=view, wait=True)
+            reader = None
+            await view.run(message)
         except Exception as e:
             await interaction.followup.send(f"Error: {str(e)}")
+        finally:
+            if reader:
+                await reader.close()
+
+    @app_commands.command(name="ssh-pool", description="SSH connection pool statistics")
+    async def ssh_pool_stats(self, interaction: discord.Interaction):
+        stats = ssh_pool.stats()
+        total = stats["hits"] + stats["misses"]
+        hit_rate = (stats["hits"] / total * 100) if total else 0
+        lines = [
+            f"Hits: {stats['hits']}",
+            f"Misses: {stats['misses']}",
+            f"Hit rate: {hit_rate:.0f}%",
+            f"Reconnects: {stats['reconnects']}",
+        ]
+        for key, count in stats["open"].items():
+            lines.append(f"{key}: {count} open")
+        for key, state in stats["breakers"].items():
+            lines.append(f"{key}: circuit {state}")
+        await interaction.response.send_message("**SSH pool:**\n```\n" + "\n".join(lines) + "\n```")
 
 
 async def setup(bot: commands.Bot):
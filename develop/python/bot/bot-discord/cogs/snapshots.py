@@ -0,0 +1,78 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+from utils.ssh import default_host_key
+from utils.collectors import snapshot_store, SNAPSHOT_SERVING_ENABLED, SNAPSHOT_REFRESH_INTERVAL
+from utils.facts import host_facts
+
+# Monitored hosts are refreshed too when the hosts config is available
+try:
+    from utils.hosts import (
+        get_monitored_hosts, get_host_display_name, add_reload_listener, remove_reload_listener,
+    )
+    MULTI_HOST_MODE = True
+except ImportError:
+    MULTI_HOST_MODE = False
+
+
+class Snapshots(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    def wanted_hosts(self) -> dict:
+        """snapshot key -> host_id (None for the default host in legacy mode)."""
+        hosts = {default_host_key(): default_host_key() if MULTI_HOST_MODE else None}
+        if MULTI_HOST_MODE:
+            for host_id in get_monitored_hosts():
+                hosts[host_id] = host_id
+        return hosts
+
+    async def cog_load(self):
+        if not SNAPSHOT_SERVING_ENABLED:
+            return
+        try:
+            hosts = self.wanted_hosts()
+        except Exception as e:
+            print(f"Snapshot serving disabled: {e}")
+            return
+        for key, host_id in hosts.items():
+            snapshot_store.start_host(key, host_id)
+        if MULTI_HOST_MODE:
+            add_reload_listener(self.on_hosts_reload)
+        print(f"Snapshot refresh started for {len(hosts)} hosts every {SNAPSHOT_REFRESH_INTERVAL:.0f}s")
+
+    async def cog_unload(self):
+        if MULTI_HOST_MODE:
+            remove_reload_listener(self.on_hosts_reload)
+        snapshot_store.stop_all()
+
+    def on_hosts_reload(self, diff):
+        hosts = self.wanted_hosts()
+        for key in snapshot_store.hosts:
+            if key not in hosts or key in diff.reconnect:
+                snapshot_store.stop_host(key)
+        for key, host_id in hosts.items():
+            snapshot_store.start_host(key, host_id)
+
+    @app_commands.command(name="snapshot-status", description="Background snapshot age per host")
+    async def snapshot_status(self, interaction: discord.Interaction):
+        if not snapshot_store.hosts:
+            await interaction.response.send_message("Snapshot serving is not enabled", ephemeral=True)
+            return
+
+        lines = []
+        for key in sorted(snapshot_store.hosts):
+            name = get_host_display_name(key) if MULTI_HOST_MODE else key
+            latest = snapshot_store.get(key, max_age=float("inf"))
+            line = f"{name}: snapshot {latest[1]:.0f}s old" if latest else f"{name}: no snapshot yet"
+            facts = host_facts.peek(key)
+            if facts:
+                line += f", facts {facts.age / 60:.0f} min old"
+            if key in snapshot_store.errors:
+                line += f" ({snapshot_store.errors[key][:80]})"
+            lines.append(line)
+        await interaction.response.send_message("**Snapshots:**\n```\n" + "\n".join(lines) + "\n```")
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Snapshots(bot))
@@ -1,8 +1,26 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from utils.ssh import run_ssh_command, SSH_HOST
-from utils.views import QuickActionsView
+from utils.ssh import SSH_HOST
+from utils.views import send_formatted
+from utils.timeseries import metrics_history, format_trend
+
+# Trends are kept per host id, only available with the hosts config
+try:
+    from utils.hosts import get_default_host
+    MULTI_HOST_MODE = True
+except ImportError:
+    MULTI_HOST_MODE = False
+
+
+def get_trend(metric: str) -> str:
+    """Trend line for the default host from collected history, if any."""
+    try:
+        host_id = get_default_host() if MULTI_HOST_MODE else SSH_HOST
+    except Exception:
+        host_id = SSH_HOST
+    trend = format_trend(metrics_history.summary(host_id, metric))
+    return f"\n{trend}" if trend else ""
 
 
 class SystemMonitor(commands.Cog):
@@ -11,51 +29,19 @@ class SystemMonitor(commands.Cog):
 
     @app_commands.command(name="memory", description="Check memory usage")
     async def memory(self, interaction: discord.Interaction):
-        await interaction.response.defer()
-        try:
-            output = await run_ssh_command("free -mh")
-            await interaction.followup.send(
-                f"**Memory on {SSH_HOST}:**\n```\n{output}\n```",
-                view=QuickActionsView("memory")
-            )
-        except Exception as e:
-            await interaction.followup.send(f"Error: {e}")
+        await send_formatted(interaction, "memory", suffix=get_trend("ram"))
 
     @app_commands.command(name="disk", description="Check disk usage")
     async def disk(self, interaction: discord.Interaction):
-        await interaction.response.defer()
-        try:
-            output = await run_ssh_command("df -h")
-            await interaction.followup.send(
-                f"**Disk on {SSH_HOST}:**\n```\n{output}\n```",
-                view=QuickActionsView("disk")
-            )
-        except Exception as e:
-            await interaction.followup.send(f"Error: {e}")
+        await send_formatted(interaction, "disk")
 
     @app_commands.command(name="uptime", description="Check system uptime")
     async def uptime(self, interaction: discord.Interaction):
-        await interaction.response.defer()
-        try:
-            output = await run_ssh_command("uptime")
-            await interaction.followup.send(
-                f"**Uptime on {SSH_HOST}:**\n```\n{output}\n```",
-                view=QuickActionsView("uptime")
-            )
-        except Exception as e:
-            await interaction.followup.send(f"Error: {e}")
+        await send_formatted(interaction, "uptime")
 
     @app_commands.command(name="cpu", description="Check CPU usage")
     async def cpu(self, interaction: discord.Interaction):
-        await interaction.response.defer()
-        try:
-            output = await run_ssh_command("top -bn1 | head -20")
-            await interaction.followup.send(
-                f"**CPU on {SSH_HOST}:**\n```\n{output}\n```",
-                view=QuickActionsView("cpu")
-            )
-        except Exception as e:
-            await interaction.followup.send(f"Error: {e}")
+        await send_formatted(interaction, "cpu", suffix=get_trend("cpu"))
 
 
 async def setup(bot: commands.Bot):
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Import bot modules (utils, cogs) the way bot.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,31 @@
+from utils.alert_state import AlertStateMachine, FIRE, ESCALATE, RECOVER, CRITICAL, WARNING
+
+
+def feed(machine, values, trigger=90, clear=85, critical=95):
+    return [machine.evaluate("h", v, trigger, clear, critical, now=i) for i, v in enumerate(values)]
+
+
+def kinds(events):
+    return [e.kind if e else None for e in events]
+
+
+def test_oscillation_around_critical_escalates_once():
+    machine = AlertStateMachine(repeat_interval=3600)
+    events = feed(machine, [91, 96, 94, 96, 94, 96])
+    assert kinds(events) == [FIRE, ESCALATE, None, None, None, None]
+    assert machine.get("h").state == CRITICAL
+
+
+def test_critical_downgrades_below_its_hysteresis_band():
+    machine = AlertStateMachine(repeat_interval=3600)
+    events = feed(machine, [98, 91, 98], critical=97)
+    assert kinds(events) == [FIRE, None, ESCALATE]
+    machine = AlertStateMachine(repeat_interval=3600)
+    feed(machine, [98, 91], critical=97)
+    assert machine.get("h").state == WARNING
+
+
+def test_recovers_below_clear():
+    machine = AlertStateMachine(repeat_interval=3600)
+    events = feed(machine, [96, 80])
+    assert kinds(events) == [FIRE, RECOVER]
@@ -0,0 +1,28 @@
+import math
+from utils.anomaly import AnomalyDetector, FILLING
+
+
+def filling_events(values, step=300):
+    detector = AnomalyDetector(horizon=21600)
+    events = []
+    for i, value in enumerate(values):
+        events += [e for e in detector.observe("h", {"disk": value}, now=i * step) if e.kind == FILLING]
+    return events
+
+
+def test_flat_disk_on_a_percent_boundary_does_not_repeat():
+    # Rounded-up usage flipping between 94 and 95 while the disk is not growing
+    values = [94.0 if i % 2 else 95.0 for i in range(40)]
+    assert len(filling_events(values)) <= 1
+
+
+def test_flat_disk_unrounded_is_quiet():
+    values = [94.5 + (0.001 if i % 2 else 0.0) for i in range(40)]
+    assert filling_events(values) == []
+
+
+def test_growing_disk_fires_once():
+    values = [math.ceil(70 + 4 * i * 300 / 3600) for i in range(120)]
+    events = filling_events(values)
+    assert len(events) == 1
+    assert events[0].eta < 21600
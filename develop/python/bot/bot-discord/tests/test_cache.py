@@ -0,0 +1,44 @@
+import asyncio
+from utils.cache import CommandCache
+
+
+def test_waiters_survive_cancelled_leader():
+    async def scenario():
+        cache = CommandCache(ttl=0)
+        started = asyncio.Event()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                started.set()
+                await asyncio.sleep(10)
+            return "output"
+
+        leader = asyncio.create_task(cache.get("h", "uptime", fetch))
+        await started.wait()
+        waiter = asyncio.create_task(cache.get("h", "uptime", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        output, _ = await asyncio.wait_for(waiter, 1)
+        return output, calls, leader.cancelled()
+
+    output, calls, cancelled = asyncio.run(scenario())
+    assert output == "output"
+    assert calls == 2
+    assert cancelled
+
+
+def test_waiters_get_result_with_zero_ttl():
+    async def scenario():
+        cache = CommandCache(ttl=0)
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            return "output"
+
+        return await asyncio.gather(*(cache.get("h", "uptime", fetch) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert [output for output, _ in results] == ["output"] * 5
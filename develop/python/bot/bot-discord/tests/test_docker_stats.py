@@ -0,0 +1,69 @@
+import asyncio
+from utils.docker_stats import DockerStatsStream
+
+
+class FakeStream:
+    def __init__(self, data: str):
+        self.data = data
+        self.lines = data.splitlines(keepends=True)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.lines:
+            raise StopAsyncIteration
+        return self.lines.pop(0)
+
+    async def read(self):
+        return self.data
+
+
+class FakeProcess:
+    def __init__(self, exit_status: int, stderr: str):
+        self.exit_status = None
+        self._exit_status = exit_status
+        self.stdout = FakeStream("")
+        self.stderr = FakeStream(stderr)
+
+    async def wait(self):
+        self.exit_status = self._exit_status
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeConnection:
+    def __init__(self, process):
+        self.process = process
+
+    def create_process(self, command):
+        return self.process
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def test_stops_when_docker_is_missing():
+    connects = 0
+
+    async def connect():
+        nonlocal connects
+        connects += 1
+        return FakeConnection(FakeProcess(127, "sh: docker: not found"))
+
+    async def scenario():
+        stream = DockerStatsStream("no-docker-test", connect)
+        await asyncio.wait_for(stream._run(), 1)
+        return stream
+
+    stream = asyncio.run(scenario())
+    assert stream.stopped
+    assert connects == 1
+    assert "not found" in stream.last_error
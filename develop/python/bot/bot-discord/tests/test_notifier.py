@@ -0,0 +1,49 @@
+import asyncio
+import discord
+from utils.notifier import AlertQueue
+
+
+class FakeChannel:
+    def __init__(self):
+        self.sent = []
+        self.calls = 0
+
+    async def send(self, embed):
+        self.calls += 1
+        if self.calls == 1:
+            raise OSError("connection reset")
+        self.sent.append(embed)
+
+
+class FakeBot:
+    def __init__(self, channel):
+        self.channel = channel
+
+    async def wait_until_ready(self):
+        pass
+
+    def get_channel(self, channel_id):
+        return self.channel
+
+
+def test_non_http_send_error_does_not_stop_the_queue():
+    async def scenario():
+        channel = FakeChannel()
+        queue = AlertQueue(FakeBot(channel), 1)
+        queue.start()
+        queue.enqueue("critical", discord.Embed(title="first"))
+        for _ in range(50):
+            await asyncio.sleep(0)
+        queue.enqueue("warning", discord.Embed(title="second"))
+        for _ in range(100):
+            if channel.sent:
+                break
+            await asyncio.sleep(0.01)
+        alive = not queue._task.done()
+        queue.stop()
+        return channel, queue, alive
+
+    channel, queue, alive = asyncio.run(scenario())
+    assert alive
+    assert queue.failed == 1
+    assert [e.title for e in channel.sent] == ["second"]
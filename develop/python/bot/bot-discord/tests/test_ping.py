@@ -0,0 +1,13 @@
+import pytest
+from cogs.ping import ping_command
+
+
+@pytest.mark.parametrize("target", ["-f", "-c100000", "--flood", "host;reboot", "$(id)", "a b", ""])
+def test_rejects_options_and_shell(target):
+    with pytest.raises(ValueError):
+        ping_command(target)
+
+
+@pytest.mark.parametrize("target", ["example.com", "10.0.0.1", "fe80::1", "db-01"])
+def test_accepts_hosts(target):
+    assert ping_command(target) == f"ping -c 4 -- {target}"
@@ -0,0 +1,43 @@
+import asyncio
+import asyncssh
+from utils.pool import SSHConnectionPool
+from utils.breaker import HostConnectError
+
+
+class FakeConnection:
+    def __init__(self):
+        self._closed = asyncio.get_running_loop().create_future()
+
+    async def run(self, command, check=True):
+        if command == "lost":
+            self.close()
+            raise asyncssh.ConnectionLost("connection lost")
+        return command
+
+    def close(self):
+        if not self._closed.done():
+            self._closed.set_result(None)
+
+    async def wait_closed(self):
+        await self._closed
+
+
+def test_run_many_keeps_results_when_reconnect_fails():
+    async def scenario():
+        pool = SSHConnectionPool()
+        connects = 0
+
+        async def connect():
+            nonlocal connects
+            connects += 1
+            if connects > 1:
+                raise OSError("connection refused")
+            return FakeConnection()
+
+        results = await pool.run_many("run-many-test", connect, ["ok", "lost"])
+        await pool.close_all()
+        return results
+
+    results = asyncio.run(scenario())
+    assert results["ok"] == "ok"
+    assert isinstance(results["lost"], HostConnectError)
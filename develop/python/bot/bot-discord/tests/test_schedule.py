@@ -0,0 +1,28 @@
+from utils.schedule import AdaptiveScheduler, headroom
+
+
+def test_headroom_without_thresholds():
+    assert headroom({"ram": 50, "disk": 40}, {"ram": 0, "disk": 0}) == 1.0
+
+
+def test_headroom_smallest_distance():
+    assert headroom({"ram": 81, "disk": 40}, {"ram": 90, "disk": 80}) == 0.1
+
+
+def test_claim_skips_running_hosts():
+    scheduler = AdaptiveScheduler(60)
+    assert scheduler.due(["a"], now=float("inf")) == ["a"]
+    assert scheduler.claim(["a", "b"]) == ["b"]
+    assert scheduler.due(["a", "b"], now=float("inf")) == []
+    scheduler.release("b")
+    assert scheduler.claim(["a", "b"]) == ["b"]
+
+
+def test_reset_clamps_to_host_bounds():
+    scheduler = AdaptiveScheduler(300)
+    scheduler.update("a", 1.0, False, min_interval=30, max_interval=120, now=0)
+    assert scheduler.get("a").interval == 120
+    scheduler.reset("a", min_interval=30, max_interval=120)
+    assert scheduler.get("a").interval == 120
+    scheduler.reset("a", min_interval=600, max_interval=1200)
+    assert scheduler.get("a").interval == 600
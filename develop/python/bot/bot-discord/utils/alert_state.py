@@ -0,0 +1,121 @@
+import time
+from dataclasses import dataclass
+
+OK = "ok"
+WARNING = "warning"
+CRITICAL = "critical"
+
+# Event kinds returned by AlertStateMachine.evaluate
+FIRE = "fire"
+ESCALATE = "escalate"
+REPEAT = "repeat"
+RECOVER = "recover"
+
+
+@dataclass
+class AlertState:
+    """State of one (host, metric) pair."""
+    state: str = OK
+    pending_since: float = None
+    since: float = None
+    last_notified: float = None
+    peak: float = 0.0
+
+
+@dataclass
+class AlertEvent:
+    kind: str
+    level: str
+    value: float
+    duration: float
+    peak: float
+
+
+class AlertStateMachine:
+    """Per-(host, metric) OK -> WARNING -> CRITICAL -> recovered state machine.
+
+    A metric fires once it has stayed above ``trigger`` for ``min_duration``
+    seconds and only recovers once it drops below ``clear`` (hysteresis).
+    While the state holds, the same alert is repeated at most every
+    ``repeat_interval`` seconds; escalation to CRITICAL fires immediately
+    and CRITICAL is held until the value drops below ``critical`` minus the
+    same hysteresis band (``trigger - clear``).
+    """
+
+    def __init__(self, min_duration: float = 0, repeat_interval: float = 3600):
+        self.min_duration = min_duration
+        self.repeat_interval = repeat_interval
+        self._states = {}
+
+    def get(self, key) -> AlertState:
+        if key not in self._states:
+            self._states[key] = AlertState()
+        return self._states[key]
+
+    def evaluate(self, key, value: float, trigger: float, clear: float,
+                 critical: float, now: float = None):
+        """Feed one sample; returns an AlertEvent or None."""
+        if now is None:
+            now = time.monotonic()
+        st = self.get(key)
+
+        if value > trigger:
+            level = CRITICAL if value > critical else WARNING
+            if st.state == OK:
+                if st.pending_since is None:
+                    st.pending_since = now
+                if now - st.pending_since < self.min_duration:
+                    return None
+                st.state = level
+                st.since = st.pending_since
+                st.last_notified = now
+                st.peak = value
+                return AlertEvent(FIRE, level, value, now - st.since, value)
+
+            st.peak = max(st.peak, value)
+            if level == CRITICAL and st.state == WARNING:
+                st.state = CRITICAL
+                st.last_notified = now
+                return AlertEvent(ESCALATE, level, value, now - st.since, st.peak)
+            if st.state == CRITICAL and value >= critical - (trigger - clear):
+                # Hold CRITICAL inside its own hysteresis band so a value
+                # hovering around ``critical`` does not escalate again and again
+                level = CRITICAL
+            st.state = level
+            if now - st.last_notified >= self.repeat_interval:
+                st.last_notified = now
+                return AlertEvent(REPEAT, level, value, now - st.since, st.peak)
+            return None
+
+        if value < clear:
+            st.pending_since = None
+            if st.state != OK:
+                event = AlertEvent(RECOVER, OK, value, now - st.since, st.peak)
+                self._states[key] = AlertState()
+                return event
+            return None
+
+        # Inside the hysteresis band: hold an active alert, reset a pending one
+        if st.state == OK:
+            st.pending_since = None
+        return None
+
+    def active(self):
+        """Yield (key, AlertState) for all non-OK keys."""
+        for key, st in self._states.items():
+            if st.state != OK:
+                yield key, st
+
+    def drop_host(self, host_id: str):
+        for key in [k for k in self._states if k[0] == host_id]:
+            del self._states[key]
+
+
+def format_duration(seconds: float) -> str:
+    """Short human duration, e.g. 45s, 12m, 3h 5m."""
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m"
+    return f"{seconds // 3600}h {seconds % 3600 // 60}m"
@@ -0,0 +1,193 @@
+import os
+import math
+import time
+from dataclasses import dataclass
+from dotenv import load_dotenv
+from utils.alert_state import format_duration
+
+load_dotenv()
+
+ANOMALY_ENABLED = os.getenv("ANOMALY_ENABLED", "true").lower() in ("1", "true", "yes")
+# Time constants (seconds) of the baseline mean/variance and of the rate of change
+ANOMALY_BASELINE_WINDOW = float(os.getenv("ANOMALY_BASELINE_WINDOW", "3600"))
+ANOMALY_RATE_WINDOW = float(os.getenv("ANOMALY_RATE_WINDOW", "1800"))
+# A spike is this many standard deviations and at least MIN_DELTA points above the mean
+ANOMALY_SIGMA = float(os.getenv("ANOMALY_SIGMA", "4"))
+ANOMALY_MIN_DELTA = float(os.getenv("ANOMALY_MIN_DELTA", "10"))
+# Seconds of samples (and minimum count) before a baseline is trusted
+ANOMALY_WARMUP = float(os.getenv("ANOMALY_WARMUP", "1800"))
+ANOMALY_MIN_SAMPLES = int(os.getenv("ANOMALY_MIN_SAMPLES", "10"))
+# Warn when a filling metric is projected to reach 100% within this many seconds
+DISK_FULL_HORIZON = float(os.getenv("DISK_FULL_HORIZON", "21600"))
+
+# Projections this close to full are critical
+DISK_FULL_CRITICAL = 3600
+
+# Metrics that get a time-to-full projection
+FILL_METRICS = ("disk",)
+
+# Event kinds returned by AnomalyDetector.observe
+SPIKE = "spike"
+FILLING = "filling"
+
+
+class MetricBaseline:
+    """Exponentially weighted mean, variance and rate of change of one metric.
+
+    Weights decay with elapsed time rather than sample count, so irregular
+    check intervals (adaptive scheduling, stream vs probe samples) do not
+    skew the baseline. Each update is O(1) in time and memory.
+    """
+
+    __slots__ = ("window", "rate_window", "mean", "var", "rate", "last_value",
+                 "last_ts", "first_ts", "count", "spiking", "filling", "flat_since")
+
+    def __init__(self, window: float = ANOMALY_BASELINE_WINDOW, rate_window: float = ANOMALY_RATE_WINDOW):
+        self.window = window
+        self.rate_window = rate_window
+        self.mean = 0.0
+        self.var = 0.0
+        self.rate = 0.0  # units per second
+        self.last_value = None
+        self.last_ts = None
+        self.first_ts = None
+        self.count = 0
+        self.spiking = False
+        self.filling = False
+        self.flat_since = None  # since when the rate has been <= 0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.var)
+
+    def warm(self, now: float) -> bool:
+        return (self.count >= ANOMALY_MIN_SAMPLES
+                and now - self.first_ts >= ANOMALY_WARMUP)
+
+    def deviation(self, value: float) -> float:
+        """Standard deviations of value above the mean (inf on a flat baseline)."""
+        delta = value - self.mean
+        std = self.std
+        if std > 0:
+            return delta / std
+        return math.inf if delta > 0 else 0.0
+
+    def time_to_full(self, limit: float = 100.0):
+        """Seconds until the last value reaches limit at the current rate, or None."""
+        if self.last_value is None or self.rate <= 0:
+            return None
+        return max(limit - self.last_value, 0.0) / self.rate
+
+    def update(self, value: float, now: float):
+        if self.last_ts is None:
+            self.mean = value
+            self.first_ts = now
+        else:
+            dt = now - self.last_ts
+            if dt <= 0:
+                return
+            a = 1 - math.exp(-dt / self.window)
+            delta = value - self.mean
+            self.mean += a * delta
+            self.var = (1 - a) * (self.var + a * delta * delta)
+            r = 1 - math.exp(-dt / self.rate_window)
+            self.rate += r * ((value - self.last_value) / dt - self.rate)
+        self.last_value = value
+        self.last_ts = now
+        self.count += 1
+
+
+@dataclass
+class AnomalyEvent:
+    kind: str
+    level: str
+    metric: str
+    value: float
+    mean: float
+    std: float
+    sigma: float = 0.0
+    rate: float = 0.0  # units per second
+    eta: float = None  # seconds until full
+
+
+class AnomalyDetector:
+    """Per-(host, metric) baselines that flag spikes and filling disks.
+
+    A spike fires once when a sample is ``sigma`` standard deviations above
+    the baseline and re-arms when it falls back under half of that. A fill
+    projection fires once when time-to-full drops under ``horizon`` and
+    re-arms when it is beyond twice the horizon or the metric has not grown
+    for a whole rate window.
+    Samples are scored against the baseline before being folded into it.
+    """
+
+    def __init__(self, sigma: float = ANOMALY_SIGMA, min_delta: float = ANOMALY_MIN_DELTA,
+                 horizon: float = DISK_FULL_HORIZON):
+        self.sigma = sigma
+        self.min_delta = min_delta
+        self.horizon = horizon
+        self._baselines = {}
+
+    def get(self, key):
+        return self._baselines.get(key)
+
+    def items(self):
+        return self._baselines.items()
+
+    def observe(self, host_id: str, values: dict, now: float = None) -> list:
+        """Feed {metric: value} for host; returns new AnomalyEvents."""
+        if now is None:
+            now = time.monotonic()
+        events = []
+        for metric, value in values.items():
+            key = (host_id, metric)
+            baseline = self._baselines.get(key)
+            if baseline is None:
+                baseline = self._baselines[key] = MetricBaseline()
+            warm = baseline.last_ts is not None and baseline.warm(now)
+
+            if warm:
+                sigma = baseline.deviation(value)
+                if (not baseline.spiking and sigma >= self.sigma
+                        and value - baseline.mean >= self.min_delta):
+                    baseline.spiking = True
+                    events.append(AnomalyEvent(
+                        SPIKE, "warning", metric, value, baseline.mean, baseline.std, sigma=sigma
+                    ))
+                elif baseline.spiking and sigma < self.sigma / 2:
+                    baseline.spiking = False
+
+            baseline.update(value, now)
+
+            if warm and metric in FILL_METRICS:
+                eta = baseline.time_to_full()
+                if eta is None:
+                    if baseline.flat_since is None:
+                        baseline.flat_since = now
+                else:
+                    baseline.flat_since = None
+                if not baseline.filling and eta is not None and eta < self.horizon:
+                    baseline.filling = True
+                    level = "critical" if eta < DISK_FULL_CRITICAL else "warning"
+                    events.append(AnomalyEvent(
+                        FILLING, level, metric, value, baseline.mean, baseline.std,
+                        rate=baseline.rate, eta=eta
+                    ))
+                elif baseline.filling and (
+                        eta > 2 * self.horizon if eta is not None
+                        else now - baseline.flat_since >= baseline.rate_window):
+                    baseline.filling = False
+        return events
+
+    def drop_host(self, host_id: str):
+        for key in [k for k in self._baselines if k[0] == host_id]:
+            del self._baselines[key]
+
+
+def format_baseline(metric: str, baseline: MetricBaseline) -> str:
+    """Short summary, e.g. "55.1% ±3.9, +0.20%/h, full in ~3h 5m"."""
+    text = f"{baseline.mean:.1f}% ±{baseline.std:.1f}, {baseline.rate * 3600:+.2f}%/h"
+    eta = baseline.time_to_full() if metric in FILL_METRICS else None
+    if eta is not None and eta < 30 * 86400:
+        text += f", full in ~{format_duration(eta)}"
+    return text
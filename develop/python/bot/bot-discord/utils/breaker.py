@@ -0,0 +1,161 @@
+import os
+import time
+import asyncio
+import asyncssh
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Hard limit for opening one SSH connection (TCP + key exchange + auth)
+SSH_CONNECT_TIMEOUT = float(os.getenv("SSH_CONNECT_TIMEOUT", "10"))
+
+# Consecutive connect failures that open the circuit
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+# Probe backoff while open: doubles after every failed probe (seconds)
+BREAKER_BACKOFF_MIN = float(os.getenv("BREAKER_BACKOFF_MIN", "15"))
+BREAKER_BACKOFF_MAX = float(os.getenv("BREAKER_BACKOFF_MAX", "600"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+# Errors that count as the host being unreachable
+CONNECT_ERRORS = (OSError, asyncssh.Error, asyncio.TimeoutError)
+
+# Exit statuses of a long-running remote command that a retry cannot fix
+# (command not executable / not found, e.g. "docker: not found")
+PERMANENT_EXIT_STATUSES = (126, 127)
+
+
+class HostConnectError(Exception):
+    """A connection attempt failed or timed out."""
+
+    def __init__(self, host: str, cause: BaseException):
+        self.host = host
+        self.cause = cause
+        if isinstance(cause, asyncio.TimeoutError):
+            self.reason = f"connect timed out after {SSH_CONNECT_TIMEOUT:.0f}s"
+        else:
+            self.reason = str(cause) or type(cause).__name__
+        super().__init__(f"Cannot connect to {host}: {self.reason}")
+
+
+class HostUnavailableError(Exception):
+    """Raised without connecting while a host's circuit is open."""
+
+    def __init__(self, host: str, breaker: "CircuitBreaker"):
+        self.host = host
+        self.since = breaker.down_since
+        since = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(breaker.down_since))
+        retry = max(breaker.retry_at - time.monotonic(), 0)
+        super().__init__(
+            f"{host} is down since {since} ({breaker.last_error}), next retry in {retry:.0f}s"
+        )
+
+
+class CircuitBreaker:
+    """closed -> open after repeated connect failures -> half-open probe -> closed."""
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.down_since = None
+        self.last_error = None
+        self.backoff = BREAKER_BACKOFF_MIN
+        self.retry_at = 0.0
+        self.probing = False
+
+    def allow(self) -> bool:
+        """Whether a connect attempt may be made now (may start a half-open probe)."""
+        if self.state == CLOSED:
+            return True
+        if self.probing or time.monotonic() < self.retry_at:
+            return False
+        self.state = HALF_OPEN
+        self.probing = True
+        return True
+
+
+class BreakerRegistry:
+    """Circuit breakers per pool key with state change listeners."""
+
+    def __init__(self):
+        self.breakers = {}
+        self._listeners = []
+
+    def get(self, host: str) -> CircuitBreaker:
+        if host not in self.breakers:
+            self.breakers[host] = CircuitBreaker()
+        return self.breakers[host]
+
+    def add_listener(self, callback):
+        """Register callback(host, old_state, new_state, breaker)."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _set_state(self, host: str, breaker: CircuitBreaker, state: str):
+        old, breaker.state = breaker.state, state
+        if old == state:
+            return
+        print(f"SSH circuit for {host}: {old} -> {state}")
+        for callback in list(self._listeners):
+            try:
+                callback(host, old, state, breaker)
+            except Exception as e:
+                print(f"Breaker listener failed: {e}")
+
+    def _failure(self, host: str, breaker: CircuitBreaker, error: str):
+        breaker.failures += 1
+        breaker.last_error = error
+        if breaker.down_since is None:
+            breaker.down_since = time.time()
+        if breaker.state == HALF_OPEN:
+            breaker.backoff = min(breaker.backoff * 2, BREAKER_BACKOFF_MAX)
+        elif breaker.failures < BREAKER_FAILURE_THRESHOLD:
+            return
+        breaker.retry_at = time.monotonic() + breaker.backoff
+        self._set_state(host, breaker, OPEN)
+
+    def _success(self, host: str, breaker: CircuitBreaker):
+        breaker.failures = 0
+        breaker.backoff = BREAKER_BACKOFF_MIN
+        self._set_state(host, breaker, CLOSED)
+        breaker.down_since = None
+        breaker.last_error = None
+
+    async def connect(self, host: str, connect):
+        """Open a connection through host's breaker with SSH_CONNECT_TIMEOUT."""
+        breaker = self.get(host)
+        if not breaker.allow():
+            raise HostUnavailableError(host, breaker)
+        try:
+            conn = await asyncio.wait_for(connect(), SSH_CONNECT_TIMEOUT)
+        except CONNECT_ERRORS as e:
+            error = HostConnectError(host, e)
+            breaker.probing = False
+            self._failure(host, breaker, error.reason)
+            raise error from e
+        except BaseException:
+            breaker.probing = False
+            if breaker.state == HALF_OPEN:
+                breaker.state = OPEN
+            raise
+        breaker.probing = False
+        self._success(host, breaker)
+        return conn
+
+    def drop_host(self, host: str):
+        self.breakers.pop(host, None)
+
+    def stats(self) -> dict:
+        return {
+            host: breaker.state
+            for host, breaker in self.breakers.items() if breaker.state != CLOSED
+        }
+
+
+# Shared breakers used by the SSH pool
+ssh_breakers = BreakerRegistry()
@@ -0,0 +1,107 @@
+import os
+import time
+import asyncio
+from dotenv import load_dotenv
+from utils.ssh import run_ssh_command, default_host_key
+
+load_dotenv()
+
+# Seconds a command result is reused for identical requests
+COMMAND_CACHE_TTL = float(os.getenv("COMMAND_CACHE_TTL", "5"))
+
+
+class CommandCache:
+    """TTL cache with in-flight de-duplication keyed by (host, command).
+
+    Concurrent requests for the same key share one execution; results are
+    reused for ``ttl`` seconds. Failures are not cached.
+    """
+
+    def __init__(self, ttl: float = COMMAND_CACHE_TTL):
+        self.ttl = ttl
+        self._results = {}
+        self._inflight = {}
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    def _prune(self, now: float):
+        expired = [k for k, (ts, _) in self._results.items() if now - ts > self.ttl]
+        for key in expired:
+            del self._results[key]
+
+    async def get(self, host: str, command: str, fetch):
+        """Return (output, age_seconds), running fetch() only when needed."""
+        key = (host, command)
+        while True:
+            now = time.monotonic()
+            cached = self._results.get(key)
+            if cached and now - cached[0] <= self.ttl:
+                self.hits += 1
+                return cached[1], now - cached[0]
+
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            # Waiters get the leader's (timestamp, output) from the future
+            # itself, so a prune in between cannot lose it
+            self.coalesced += 1
+            result = await asyncio.shield(future)
+            if result is not None:
+                ts, output = result
+                return output, time.monotonic() - ts
+            # The leader was cancelled: retry, possibly as the new leader
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            output = await fetch()
+        except asyncio.CancelledError:
+            # Only the leader's caller was cancelled; wake waiters to retry
+            future.set_result(None)
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure does not warn
+            future.exception()
+            raise
+        else:
+            ts = time.monotonic()
+            self._prune(now)
+            self._results[key] = (ts, output)
+            future.set_result((ts, output))
+            return output, 0.0
+        finally:
+            del self._inflight[key]
+
+    def invalidate(self, host: str = None):
+        """Drop cached results, for one host or all of them."""
+        if host is None:
+            self._results.clear()
+            return
+        for key in [k for k in self._results if k[0] == host]:
+            del self._results[key]
+
+
+command_cache = CommandCache()
+
+
+async def run_cached_command(command: str, host_id: str = None):
+    """Run command on host_id (or the default host) through the shared cache.
+
+    Returns (output, age_seconds). The default host is keyed like snapshots
+    and the pool (default_host_key()), so panel and HostSelect requests for
+    it share one entry.
+    """
+    if host_id:
+        from utils.hosts import run_ssh_command_on_host
+        return await command_cache.get(host_id, command, lambda: run_ssh_command_on_host(host_id, command))
+    return await command_cache.get(default_host_key(), command, lambda: run_ssh_command(command))
+
+
+def format_age(age: float) -> str:
+    """Freshness note for replies."""
+    if age < 1:
+        return "live"
+    return f"cached {age:.0f}s ago"
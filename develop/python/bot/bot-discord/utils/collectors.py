@@ -0,0 +1,418 @@
+import os
+import math
+import shlex
+import time
+import asyncio
+from dataclasses import dataclass, field
+from dotenv import load_dotenv
+from utils.ssh import run_ssh_command, default_host_key
+from utils.cache import command_cache
+from utils.schedule import phase_offset
+from utils.facts import HostFacts, host_facts, READ_BOOT_ID
+from utils.telemetry import parse_seconds
+
+load_dotenv()
+
+# Snapshot serving: background refresh per host, commands answer from it
+SNAPSHOT_SERVING_ENABLED = os.getenv("SNAPSHOT_SERVING_ENABLED", "true").lower() in ("1", "true", "yes")
+SNAPSHOT_REFRESH_INTERVAL = float(os.getenv("SNAPSHOT_REFRESH_INTERVAL", "30"))
+SNAPSHOT_MAX_AGE = float(os.getenv("SNAPSHOT_MAX_AGE", "90"))
+
+# Number of top processes by %CPU included in snapshots
+TOP_PROCESSES = 5
+
+# Previous CPU counters older than this are not used for deltas (seconds)
+CPU_DELTA_MAX_AGE = 600
+
+# In-command CPU sampling delay when there is no usable previous sample
+CPU_SAMPLE_DELAY = 0.5
+
+# Cache key for snapshots in the shared command cache
+SNAPSHOT_CACHE_KEY = "__snapshot__"
+
+
+def collect_command(facts, cpu_delay: float = 0) -> str:
+    """One remote exec reading the volatile /proc counters, statvfs of the
+    mounts known from facts and top processes.
+
+    /proc files are read with shell builtins; only stat, ps and head are forked.
+    CPU count, total memory and the mount list come from HostFacts. With
+    cpu_delay the cpu line of /proc/stat is read a second time after
+    sleeping, for hosts without a previous sample.
+    """
+    read_stat = "read l < /proc/stat; echo \"$l\"; "
+    command = (
+        "echo @@boot; " + READ_BOOT_ID + "echo \"$b\"; "
+        "echo @@stat; " + read_stat +
+        "echo @@meminfo; while read k v _; do case $k in "
+        "MemFree:|MemAvailable:|Buffers:|Cached:|SReclaimable:|SwapTotal:|SwapFree:) echo \"$k $v\";; "
+        "esac; done < /proc/meminfo; "
+        "echo @@loadavg; read l < /proc/loadavg; echo \"$l\"; "
+        "echo @@uptime; read l < /proc/uptime; echo \"$l\"; "
+    )
+    if facts.mounts:
+        mounts = " ".join(shlex.quote(mount) for _, mount, _ in facts.mounts)
+        command += f"echo @@statfs; stat -f -c '%n %b %f %a %S' {mounts} 2>/dev/null; "
+    command += f"echo @@ps; ps -eo pid=,pcpu=,pmem=,comm= --sort=-pcpu 2>/dev/null | head -n {TOP_PROCESSES}; "
+    if cpu_delay:
+        command += f"sleep {cpu_delay}; echo @@stat2; " + read_stat
+    return command
+
+
+@dataclass
+class CpuTimes:
+    """Aggregate jiffies from the first line of /proc/stat."""
+    user: int
+    nice: int
+    system: int
+    idle: int
+    iowait: int = 0
+    irq: int = 0
+    softirq: int = 0
+    steal: int = 0
+
+    @property
+    def total(self) -> int:
+        return (self.user + self.nice + self.system + self.idle + self.iowait
+                + self.irq + self.softirq + self.steal)
+
+    @property
+    def idle_all(self) -> int:
+        return self.idle + self.iowait
+
+
+@dataclass
+class CpuUsage:
+    """CPU usage percentages computed from two CpuTimes samples."""
+    busy: float
+    user: float
+    system: float
+    iowait: float
+    steal: float
+    interval: float
+
+
+@dataclass
+class MemInfo:
+    total_kb: int
+    free_kb: int
+    available_kb: int
+    buffers_kb: int
+    cached_kb: int
+    swap_total_kb: int
+    swap_free_kb: int
+
+    @property
+    def used_kb(self) -> int:
+        return self.total_kb - self.available_kb
+
+    @property
+    def percent(self) -> float:
+        return self.used_kb / self.total_kb * 100 if self.total_kb else 0.0
+
+    @property
+    def swap_used_kb(self) -> int:
+        return self.swap_total_kb - self.swap_free_kb
+
+
+@dataclass
+class LoadAvg:
+    load1: float
+    load5: float
+    load15: float
+    running: int
+    processes: int
+
+
+@dataclass
+class FsUsage:
+    device: str
+    mount: str
+    fstype: str
+    size_bytes: int
+    used_bytes: int
+    avail_bytes: int
+
+    @property
+    def percent(self) -> float:
+        # Same formula as df: used / (used + available to non-root), rounded up
+        total = self.used_bytes + self.avail_bytes
+        return float(math.ceil(self.used_bytes * 100 / total)) if total else 0.0
+
+
+@dataclass
+class ProcessInfo:
+    pid: int
+    cpu_percent: float
+    mem_percent: float
+    command: str
+
+
+@dataclass
+class HostSnapshot:
+    """Typed records collected from one host in a single exec."""
+    cpus: int
+    cpu_times: CpuTimes
+    cpu_usage: CpuUsage
+    memory: MemInfo
+    load: LoadAvg
+    uptime_seconds: float
+    filesystems: list = field(default_factory=list)
+    processes: list = field(default_factory=list)
+    facts: HostFacts = None
+
+
+def _split_sections(output: str) -> dict:
+    sections = {}
+    current = None
+    for line in output.splitlines():
+        if line.startswith("@@"):
+            current = line[2:].strip()
+            sections[current] = []
+        elif current is not None and line.strip():
+            sections[current].append(line)
+    return sections
+
+
+def parse_cpu_times(line: str) -> CpuTimes:
+    values = [int(v) for v in line.split()[1:9]]
+    return CpuTimes(*values)
+
+
+def cpu_usage_between(prev: CpuTimes, cur: CpuTimes, interval: float) -> CpuUsage:
+    d_total = cur.total - prev.total
+    if d_total <= 0:
+        return CpuUsage(0.0, 0.0, 0.0, 0.0, 0.0, interval)
+
+    def pct(attr):
+        return (getattr(cur, attr) - getattr(prev, attr)) / d_total * 100
+
+    return CpuUsage(
+        busy=(d_total - (cur.idle_all - prev.idle_all)) / d_total * 100,
+        user=pct("user") + pct("nice"),
+        system=pct("system") + pct("irq") + pct("softirq"),
+        iowait=pct("iowait"),
+        steal=pct("steal"),
+        interval=interval,
+    )
+
+
+def parse_meminfo(lines, total_kb: int = 0) -> MemInfo:
+    values = {}
+    for line in lines:
+        key, _, rest = line.partition(":")
+        parts = rest.split()
+        if parts:
+            values[key] = int(parts[0])
+    return MemInfo(
+        total_kb=values.get("MemTotal", total_kb),
+        free_kb=values.get("MemFree", 0),
+        available_kb=values.get("MemAvailable", values.get("MemFree", 0)),
+        buffers_kb=values.get("Buffers", 0),
+        cached_kb=values.get("Cached", 0) + values.get("SReclaimable", 0),
+        swap_total_kb=values.get("SwapTotal", 0),
+        swap_free_kb=values.get("SwapFree", 0),
+    )
+
+
+def parse_loadavg(line: str) -> LoadAvg:
+    parts = line.split()
+    running, _, processes = parts[3].partition("/")
+    return LoadAvg(float(parts[0]), float(parts[1]), float(parts[2]), int(running), int(processes))
+
+
+def parse_filesystems(mounts, statfs_lines) -> list:
+    """FsUsage for statfs lines of known mounts, given (device, mount, fstype) tuples."""
+    mounts = {mount: (device, fstype) for device, mount, fstype in mounts}
+
+    filesystems = []
+    seen = set()
+    for line in statfs_lines:
+        parts = line.rsplit(None, 4)
+        if len(parts) != 5 or parts[0] in seen or parts[0] not in mounts:
+            continue
+        mount = parts[0]
+        blocks, free, avail, bsize = (int(p) for p in parts[1:])
+        seen.add(mount)
+        device, fstype = mounts[mount]
+        filesystems.append(FsUsage(
+            device=device,
+            mount=mount,
+            fstype=fstype,
+            size_bytes=blocks * bsize,
+            used_bytes=(blocks - free) * bsize,
+            avail_bytes=avail * bsize,
+        ))
+    return filesystems
+
+
+def parse_processes(lines) -> list:
+    processes = []
+    for line in lines:
+        parts = line.split(None, 3)
+        if len(parts) == 4:
+            processes.append(ProcessInfo(int(parts[0]), float(parts[1]), float(parts[2]), parts[3]))
+    return processes
+
+
+class CpuTracker:
+    """Keeps the previous /proc/stat counters per host for CPU% deltas."""
+
+    def __init__(self):
+        self._last = {}
+
+    def previous(self, host: str):
+        entry = self._last.get(host)
+        if entry and time.monotonic() - entry[0] <= CPU_DELTA_MAX_AGE:
+            return entry
+        return None
+
+    def update(self, host: str, times: CpuTimes):
+        self._last[host] = (time.monotonic(), times)
+
+    def drop_host(self, host: str):
+        self._last.pop(host, None)
+
+
+cpu_tracker = CpuTracker()
+
+
+def _boot_id(sections: dict) -> str:
+    boot = sections.get("boot")
+    return boot[0].strip() if boot else None
+
+
+def parse_snapshot(output: str, facts, previous=None) -> HostSnapshot:
+    """Parse collect_command output, completed with HostFacts.
+
+    previous is a (monotonic_time, CpuTimes) pair from CpuTracker; without it
+    the in-command @@stat2 sample is used for CPU usage.
+    """
+    sections = _split_sections(output)
+    try:
+        cpu_times = parse_cpu_times(sections["stat"][0])
+
+        if "stat2" in sections:
+            cpu_usage = cpu_usage_between(cpu_times, parse_cpu_times(sections["stat2"][0]), CPU_SAMPLE_DELAY)
+            cpu_times = parse_cpu_times(sections["stat2"][0])
+        elif previous:
+            cpu_usage = cpu_usage_between(previous[1], cpu_times, time.monotonic() - previous[0])
+        else:
+            cpu_usage = CpuUsage(0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+        return HostSnapshot(
+            cpus=facts.cpus,
+            cpu_times=cpu_times,
+            cpu_usage=cpu_usage,
+            memory=parse_meminfo(sections["meminfo"], facts.mem_total_kb),
+            load=parse_loadavg(sections["loadavg"][0]),
+            uptime_seconds=float(sections["uptime"][0].split()[0]),
+            filesystems=parse_filesystems(facts.mounts, sections.get("statfs", [])),
+            processes=parse_processes(sections.get("ps", [])),
+            facts=facts,
+        )
+    except (KeyError, IndexError, ValueError) as e:
+        raise ValueError(f"Malformed collector output: {e}") from e
+
+
+async def fetch_snapshot(host_id: str = None) -> HostSnapshot:
+    """Collect a fresh snapshot from host_id (or the default host)."""
+    key = host_id or default_host_key()
+    if host_id:
+        from utils.hosts import run_ssh_command_on_host
+        run = lambda command: run_ssh_command_on_host(host_id, command)
+    else:
+        run = run_ssh_command
+
+    facts = await host_facts.get(key, run)
+    previous = cpu_tracker.previous(key)
+    output = await run(collect_command(facts, 0 if previous else CPU_SAMPLE_DELAY))
+    boot_id = _boot_id(_split_sections(output))
+    if boot_id and boot_id != facts.boot_id:
+        # Rebooted since the facts were collected: mounts, CPUs or RAM may
+        # differ and the previous CPU counters are meaningless
+        facts = await host_facts.get(key, run, boot_id=boot_id)
+        cpu_tracker.drop_host(key)
+        previous = None
+        output = await run(collect_command(facts, CPU_SAMPLE_DELAY))
+    with parse_seconds.time(command="snapshot"):
+        snapshot = parse_snapshot(output, facts, previous)
+    cpu_tracker.update(key, snapshot.cpu_times)
+    snapshot_store.put(key, snapshot)
+    return snapshot
+
+
+class SnapshotStore:
+    """Latest snapshot per host, kept fresh by background refresh tasks."""
+
+    def __init__(self, interval: float = SNAPSHOT_REFRESH_INTERVAL):
+        self.interval = interval
+        self._latest = {}
+        self._tasks = {}
+        self.errors = {}
+
+    def put(self, key: str, snapshot: HostSnapshot):
+        self._latest[key] = (time.monotonic(), snapshot)
+
+    def get(self, key: str, max_age: float = SNAPSHOT_MAX_AGE):
+        """Return (snapshot, age_seconds) if one is fresher than max_age."""
+        entry = self._latest.get(key)
+        if entry is None:
+            return None
+        age = time.monotonic() - entry[0]
+        if age > max_age:
+            return None
+        return entry[1], age
+
+    def invalidate(self):
+        """Forget all stored snapshots (the next request collects anew)."""
+        self._latest.clear()
+
+    def start_host(self, key: str, host_id: str = None):
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.create_task(self._run(key, host_id))
+
+    def stop_host(self, key: str):
+        task = self._tasks.pop(key, None)
+        if task:
+            task.cancel()
+        self._latest.pop(key, None)
+
+    def stop_all(self):
+        for key in list(self._tasks):
+            self.stop_host(key)
+
+    @property
+    def hosts(self):
+        return list(self._tasks)
+
+    async def _run(self, key: str, host_id: str):
+        # Spread hosts over the interval like the alert scheduler
+        await asyncio.sleep(phase_offset(key, self.interval))
+        while True:
+            try:
+                await fetch_snapshot(host_id)
+                self.errors.pop(key, None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors[key] = str(e)
+            await asyncio.sleep(self.interval)
+
+
+snapshot_store = SnapshotStore()
+
+
+async def collect_snapshot(host_id: str = None, live: bool = False):
+    """Snapshot for host_id (or the default host). Returns (snapshot, age_seconds).
+
+    Served from the background snapshot when fresh, else collected through
+    the shared command cache. live forces a new collection.
+    """
+    key = host_id or default_host_key()
+    if live:
+        return await fetch_snapshot(host_id), 0.0
+    latest = snapshot_store.get(key)
+    if latest:
+        return latest
+    return await command_cache.get(key, SNAPSHOT_CACHE_KEY, lambda: fetch_snapshot(host_id))
@@ -0,0 +1,278 @@
+import os
+import re
+import json
+import time
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from dotenv import load_dotenv
+from utils.breaker import ssh_breakers, PERMANENT_EXIT_STATUSES
+from utils.telemetry import parse_seconds
+
+load_dotenv()
+
+DOCKER_STATS_ENABLED = os.getenv("DOCKER_STATS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Stats older than this are not served (seconds)
+DOCKER_STATS_MAX_AGE = float(os.getenv("DOCKER_STATS_MAX_AGE", "30"))
+# History: one point per container every N seconds, N points kept (10 min by default)
+DOCKER_STATS_HISTORY_INTERVAL = float(os.getenv("DOCKER_STATS_HISTORY_INTERVAL", "10"))
+DOCKER_STATS_HISTORY_POINTS = int(os.getenv("DOCKER_STATS_HISTORY_POINTS", "60"))
+DOCKER_STATS_BACKOFF_MAX = float(os.getenv("DOCKER_STATS_BACKOFF_MAX", "300"))
+
+# Streaming docker stats, one JSON object per container per refresh
+DOCKER_STATS_COMMAND = "docker stats --format '{{json .}}'"
+
+# docker stats prints "clear screen" escapes before every refresh
+_ESCAPE_RE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+_SIZE_RE = re.compile(r"([\d.]+)\s*([A-Za-z]*)")
+
+_UNITS = {
+    "": 1, "b": 1,
+    "kb": 1000, "mb": 1000 ** 2, "gb": 1000 ** 3, "tb": 1000 ** 4,
+    "kib": 1024, "mib": 1024 ** 2, "gib": 1024 ** 3, "tib": 1024 ** 4,
+}
+
+
+def parse_size(text: str) -> float:
+    """Docker size string (12.3MiB, 1.2kB, 0B) to bytes."""
+    match = _SIZE_RE.match(text.strip())
+    if not match:
+        return 0.0
+    return float(match.group(1)) * _UNITS.get(match.group(2).lower(), 1)
+
+
+def _parse_pair(text: str):
+    left, _, right = text.partition("/")
+    return parse_size(left), parse_size(right)
+
+
+@dataclass
+class ContainerStats:
+    name: str
+    container_id: str
+    cpu_percent: float
+    mem_usage: float
+    mem_limit: float
+    mem_percent: float
+    net_rx: float
+    net_tx: float
+    block_read: float
+    block_write: float
+    pids: int
+    received: float
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.received
+
+
+def parse_stats_line(line: str) -> ContainerStats:
+    """Parse one ``docker stats --format '{{json .}}'`` line."""
+    try:
+        data = json.loads(line)
+        mem_usage, mem_limit = _parse_pair(data.get("MemUsage", ""))
+        net_rx, net_tx = _parse_pair(data.get("NetIO", ""))
+        block_read, block_write = _parse_pair(data.get("BlockIO", ""))
+        return ContainerStats(
+            name=data["Name"],
+            container_id=data.get("ID", ""),
+            cpu_percent=float(data.get("CPUPerc", "0%").rstrip("%") or 0),
+            mem_usage=mem_usage,
+            mem_limit=mem_limit,
+            mem_percent=float(data.get("MemPerc", "0%").rstrip("%") or 0),
+            net_rx=net_rx,
+            net_tx=net_tx,
+            block_read=block_read,
+            block_write=block_write,
+            pids=int(data.get("PIDs") or 0),
+            received=time.monotonic(),
+        )
+    except (KeyError, ValueError, TypeError) as e:
+        raise ValueError(f"Malformed docker stats line: {e}") from e
+
+
+class DockerStatsStream:
+    """One long-running ``docker stats`` session for a host.
+
+    Keeps the latest stats per running container and a short CPU/memory
+    history. Containers missing from a complete refresh are dropped.
+    Connects through the host's circuit breaker and stops for good when
+    docker is missing on the host.
+    """
+
+    def __init__(self, host: str, connect):
+        self.host = host
+        self.connect = connect
+        self.containers = {}
+        self.history = {}
+        self.updated = None
+        self.last_error = None
+        self.reconnects = 0
+        self.stopped = False
+        self._batch = set()
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def _end_batch(self):
+        if not self._batch:
+            return
+        for name in [n for n in self.containers if n not in self._batch]:
+            del self.containers[name]
+            self.history.pop(name, None)
+        self._batch = set()
+
+    def _record(self, stats: ContainerStats):
+        if stats.name in self._batch:
+            # No escape codes seen: a repeated name starts a new refresh
+            self._end_batch()
+        self._batch.add(stats.name)
+        self.containers[stats.name] = stats
+        self.updated = stats.received
+
+        points = self.history.get(stats.name)
+        if points is None:
+            points = self.history[stats.name] = deque(maxlen=DOCKER_STATS_HISTORY_POINTS)
+        now = time.time()
+        if not points or now - points[-1][0] >= DOCKER_STATS_HISTORY_INTERVAL:
+            points.append((now, stats.cpu_percent, stats.mem_percent))
+
+    def feed(self, line: str):
+        """Process one raw output line."""
+        cleaned = _ESCAPE_RE.sub("", line)
+        if len(cleaned) != len(line):
+            self._end_batch()
+        cleaned = cleaned.strip()
+        if not cleaned:
+            return
+        try:
+            with parse_seconds.time(command="docker stats"):
+                stats = parse_stats_line(cleaned)
+        except ValueError as e:
+            self.last_error = str(e)
+            return
+        self._record(stats)
+
+    async def _run(self):
+        backoff = 1.0
+        while True:
+            try:
+                async with await ssh_breakers.connect(self.host, self.connect) as conn:
+                    async with conn.create_process(DOCKER_STATS_COMMAND) as process:
+                        async for line in process.stdout:
+                            self.feed(line)
+                            backoff = 1.0
+                        stderr = (await process.stderr.read()).strip()
+                        await process.wait()
+                self.last_error = stderr[:200] if stderr else "docker stats exited"
+                if process.exit_status in PERMANENT_EXIT_STATUSES:
+                    self.stopped = True
+                    return
+            except asyncio.CancelledError:
+                raise
+            except ValueError as e:
+                # Unknown host or missing key: reconnecting cannot help
+                self.last_error = str(e)
+                self.stopped = True
+                return
+            except Exception as e:
+                self.last_error = str(e)
+
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, DOCKER_STATS_BACKOFF_MAX)
+
+
+class DockerStatsManager:
+    """Keeps one DockerStatsStream per host."""
+
+    def __init__(self):
+        self.streams = {}
+
+    def start_host(self, host: str, connect):
+        if host in self.streams:
+            return
+        stream = self.streams[host] = DockerStatsStream(host, connect)
+        stream.start()
+
+    def stop_host(self, host: str):
+        stream = self.streams.pop(host, None)
+        if stream:
+            stream.stop()
+
+    def stop_all(self):
+        for host in list(self.streams):
+            self.stop_host(host)
+
+    def latest(self, host: str, max_age: float = DOCKER_STATS_MAX_AGE):
+        """Return (containers sorted by CPU, age) or None if stale or missing."""
+        stream = self.streams.get(host)
+        if not stream or stream.updated is None:
+            return None
+        age = time.monotonic() - stream.updated
+        if age > max_age:
+            return None
+        containers = sorted(stream.containers.values(), key=lambda c: c.cpu_percent, reverse=True)
+        return containers, age
+
+    def history(self, host: str, name: str):
+        """List of (ts, cpu_percent, mem_percent) points for a container."""
+        stream = self.streams.get(host)
+        if not stream:
+            return []
+        return list(stream.history.get(name, ()))
+
+
+# Shared collector, started by cogs/docker_monitor.py
+docker_stats = DockerStatsManager()
+
+
+def _short_bytes(num: float) -> str:
+    for unit in ("B", "kB", "MB", "GB"):
+        if num < 1000 or unit == "GB":
+            return f"{num:.0f}{unit}" if unit == "B" else f"{num:.1f}{unit}"
+        num /= 1000
+
+
+def format_stats_table(containers) -> str:
+    """Fixed-width table like docker stats, for code blocks."""
+    lines = [f"{'NAME':<20} {'CPU %':>7} {'MEM %':>6} {'MEM':>9} {'NET I/O':>17} {'BLOCK I/O':>17}"]
+    for c in containers:
+        net = f"{_short_bytes(c.net_rx)}/{_short_bytes(c.net_tx)}"
+        block = f"{_short_bytes(c.block_read)}/{_short_bytes(c.block_write)}"
+        lines.append(
+            f"{c.name[:20]:<20} {c.cpu_percent:>6.1f}% {c.mem_percent:>5.1f}% "
+            f"{_short_bytes(c.mem_usage):>9} {net:>17} {block:>17}"
+        )
+    return "\n".join(lines)
+
+
+def format_stats_compact(containers) -> str:
+    """Short per-container CPU/MEM lines for mobile."""
+    if not containers:
+        return "No running containers"
+    return "\n".join(
+        f"{c.name[:15]}: {c.cpu_percent:.0f}% CPU, {c.mem_percent:.0f}% MEM"
+        for c in containers
+    )
+
+
+def format_history(points) -> str:
+    """Min/avg/max of CPU and memory over the history window."""
+    if not points:
+        return "No history yet"
+    cpu = [p[1] for p in points]
+    mem = [p[2] for p in points]
+    minutes = (points[-1][0] - points[0][0]) / 60
+    return (
+        f"Last {minutes:.0f} min ({len(points)} points)\n"
+        f"CPU %: min {min(cpu):.1f} · avg {sum(cpu) / len(cpu):.1f} · max {max(cpu):.1f} · now {cpu[-1]:.1f}\n"
+        f"MEM %: min {min(mem):.1f} · avg {sum(mem) / len(mem):.1f} · max {max(mem):.1f} · now {mem[-1]:.1f}"
+    )
@@ -0,0 +1,151 @@
+import os
+import time
+import asyncio
+from dataclasses import dataclass, field
+from dotenv import load_dotenv
+from utils.telemetry import parse_seconds
+
+load_dotenv()
+
+# Static facts are re-collected after this many seconds, or on reboot
+FACTS_REFRESH_INTERVAL = float(os.getenv("FACTS_REFRESH_INTERVAL", "3600"))
+
+# Bump when the payload format changes; the parser rejects other versions
+FACTS_VERSION = 1
+
+# Filesystems reported by the disk collector
+REAL_FILESYSTEMS = "ext2|ext3|ext4|xfs|btrfs|zfs|vfat|exfat|ntfs|f2fs|jfs|reiserfs"
+
+# Shell snippet printing the current boot id, used by the hot-path probes
+READ_BOOT_ID = "read b < /proc/sys/kernel/random/boot_id; "
+
+# Everything that only changes on reboot (or almost never), in one exec
+FACTS_COMMAND = (
+    f"echo facts={FACTS_VERSION}; "
+    + READ_BOOT_ID + "echo boot_id=$b; "
+    "echo cpus=$(nproc); "
+    "while read k v _; do case $k in MemTotal:) echo mem_total=$v; break;; esac; done < /proc/meminfo; "
+    "read r < /proc/sys/kernel/osrelease; echo kernel=$r; "
+    "echo docker=$(docker version --format '{{.Server.Version}}' 2>/dev/null); "
+    "while read dev mnt fs _; do case $fs in "
+    f"{REAL_FILESYSTEMS}) echo \"mount=$dev $mnt $fs\";; "
+    "esac; done < /proc/mounts"
+)
+
+
+@dataclass
+class HostFacts:
+    """Parsed result of FACTS_COMMAND."""
+    boot_id: str
+    cpus: int
+    mem_total_kb: int
+    kernel: str
+    docker_version: str = None
+    mounts: list = field(default_factory=list)  # (device, mount, fstype), first mount wins
+    collected: float = 0.0
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.collected
+
+
+def parse_facts(output: str) -> HostFacts:
+    """Parse key=value payload produced by FACTS_COMMAND."""
+    values = {}
+    mounts = []
+    seen = set()
+    for line in output.strip().splitlines():
+        key, sep, value = line.partition("=")
+        if not sep:
+            continue
+        key, value = key.strip(), value.strip()
+        if key == "mount":
+            parts = value.split()
+            if len(parts) == 3 and parts[1] not in seen:
+                seen.add(parts[1])
+                mounts.append(tuple(parts))
+        else:
+            values[key] = value
+
+    version = values.get("facts")
+    if version != str(FACTS_VERSION):
+        raise ValueError(f"Unsupported facts version: {version}")
+
+    try:
+        return HostFacts(
+            boot_id=values["boot_id"],
+            cpus=int(values["cpus"]),
+            mem_total_kb=int(values["mem_total"]),
+            kernel=values.get("kernel", ""),
+            docker_version=values.get("docker") or None,
+            mounts=mounts,
+            collected=time.monotonic(),
+        )
+    except (KeyError, ValueError) as e:
+        raise ValueError(f"Malformed facts output: {e}") from e
+
+
+class FactsCache:
+    """Static facts per host (CPU count, total RAM, mounts, kernel, docker).
+
+    Collected on first use and re-collected after ``refresh_interval`` or
+    when a probe reports another boot_id. Concurrent requests for the same
+    host share one collection.
+    """
+
+    def __init__(self, refresh_interval: float = FACTS_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._facts = {}
+        self._inflight = {}
+        self.collections = 0
+
+    def peek(self, key: str):
+        """Cached facts for key without collecting, or None."""
+        return self._facts.get(key)
+
+    def fresh(self, key: str, boot_id: str = None):
+        """Cached facts for key if younger than refresh_interval (and from
+        boot_id when given), else None."""
+        facts = self._facts.get(key)
+        if (facts and facts.age <= self.refresh_interval
+                and (boot_id is None or facts.boot_id == boot_id)):
+            return facts
+        return None
+
+    def store(self, key: str, output: str) -> HostFacts:
+        """Parse FACTS_COMMAND output collected by the caller and cache it."""
+        with parse_seconds.time(command="facts"):
+            facts = parse_facts(output)
+        self._facts[key] = facts
+        self.collections += 1
+        return facts
+
+    async def get(self, key: str, run, boot_id: str = None) -> HostFacts:
+        """Facts for key, collected with run(command) when missing, stale or
+        from another boot than boot_id."""
+        facts = self.fresh(key, boot_id)
+        if facts:
+            return facts
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(self._collect(key, run))
+            task.add_done_callback(lambda t: self._collected(key, t))
+        return await asyncio.shield(task)
+
+    async def _collect(self, key: str, run) -> HostFacts:
+        return self.store(key, await run(FACTS_COMMAND))
+
+    def _collected(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark retrieved so a failure nobody awaited does not warn
+            task.exception()
+
+    def drop_host(self, key: str):
+        self._facts.pop(key, None)
+
+
+# Shared facts used by the probe and the snapshot collector
+host_facts = FactsCache()
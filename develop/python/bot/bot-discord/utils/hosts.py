@@ -1,37 +1,171 @@
 import os
 import json
 import base64
+import asyncio
+import inspect
+from dataclasses import dataclass, field
 import asyncssh
 from dotenv import load_dotenv
+from utils.pool import ssh_pool, keepalive_options
+from utils.breaker import ssh_breakers
+from utils.facts import host_facts
 
 load_dotenv()
 
 HOSTS_CONFIG_PATH = os.getenv("HOSTS_CONFIG_PATH", "hosts.json")
 
+# Seconds between hosts.json mtime checks, 0 disables hot reload
+HOSTS_RELOAD_INTERVAL = float(os.getenv("HOSTS_RELOAD_INTERVAL", "10"))
+
+# Host fields that require new SSH connections when changed
+CONNECTION_FIELDS = ("host", "user", "port", "ssh_key_base64")
+
 _hosts_config = None
-_ssh_keys = {}
+_config_mtime = None
+_ssh_keys = {}  # host_id -> (key_base64, imported key)
+_reload_listeners = []
 
 
-def load_hosts_config():
-    """Load hosts configuration from JSON file."""
-    global _hosts_config, _ssh_keys
-    
+@dataclass
+class HostsDiff:
+    """Changes between two hosts.json versions."""
+    added: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    changed: list = field(default_factory=list)
+    reconnect: list = field(default_factory=list)
+    check_interval_changed: bool = False
+
+
+def _read_config():
+    """Read and parse hosts.json, returning (config, mtime)."""
     if not os.path.exists(HOSTS_CONFIG_PATH):
         raise FileNotFoundError(f"Hosts config not found: {HOSTS_CONFIG_PATH}")
     
+    mtime = os.stat(HOSTS_CONFIG_PATH).st_mtime_ns
     with open(HOSTS_CONFIG_PATH, 'r') as f:
-        _hosts_config = json.load(f)
-    
-    # Pre-load SSH keys
-    for host_id, host_data in _hosts_config.get("hosts", {}).items():
-        key_b64 = host_data.get("ssh_key_base64", "")
-        if key_b64:
-            key_data = base64.b64decode(key_b64).decode("utf-8")
-            _ssh_keys[host_id] = asyncssh.import_private_key(key_data)
+        return json.load(f), mtime
+
+
+def _import_key(key_b64: str):
+    key_data = base64.b64decode(key_b64).decode("utf-8")
+    return asyncssh.import_private_key(key_data)
+
+
+def load_hosts_config():
+    """Load hosts configuration from JSON file.
+
+    SSH keys are imported lazily, in a worker thread on first connect, so
+    startup cost does not grow with the number of hosts.
+    """
+    global _hosts_config, _config_mtime
     
+    _hosts_config, _config_mtime = _read_config()
     return _hosts_config
 
 
+def diff_hosts_config(old: dict, new: dict) -> HostsDiff:
+    """Compare two hosts configs."""
+    old_hosts = old.get("hosts", {})
+    new_hosts = new.get("hosts", {})
+    diff = HostsDiff(
+        added=[h for h in new_hosts if h not in old_hosts],
+        removed=[h for h in old_hosts if h not in new_hosts],
+        check_interval_changed=old.get("check_interval") != new.get("check_interval"),
+    )
+    for host_id, host_data in new_hosts.items():
+        old_data = old_hosts.get(host_id)
+        if old_data is None or old_data == host_data:
+            continue
+        diff.changed.append(host_id)
+        if any(old_data.get(f) != host_data.get(f) for f in CONNECTION_FIELDS):
+            diff.reconnect.append(host_id)
+    return diff
+
+
+def add_reload_listener(callback):
+    """Register callback(diff) (sync or async) run after each hosts.json reload."""
+    _reload_listeners.append(callback)
+
+
+def remove_reload_listener(callback):
+    if callback in _reload_listeners:
+        _reload_listeners.remove(callback)
+
+
+async def reload_hosts_config(force: bool = False):
+    """Reload hosts.json if it changed. Returns HostsDiff or None if unchanged.
+
+    File reading and key imports run in a worker thread. Keys are imported
+    only for added hosts and hosts whose key changed; pooled connections of
+    removed hosts and hosts with new connection settings are closed.
+    """
+    global _hosts_config, _config_mtime
+    
+    def read_if_changed():
+        mtime = os.stat(HOSTS_CONFIG_PATH).st_mtime_ns
+        if not force and mtime == _config_mtime:
+            return None
+        return _read_config()
+    
+    result = await asyncio.to_thread(read_if_changed)
+    if result is None:
+        return None
+    new_config, mtime = result
+    diff = diff_hosts_config(_hosts_config or {}, new_config)
+    
+    new_hosts = new_config.get("hosts", {})
+    to_import = {}
+    for host_id in diff.added + diff.reconnect:
+        key_b64 = new_hosts[host_id].get("ssh_key_base64", "")
+        cached = _ssh_keys.get(host_id)
+        if key_b64 and (not cached or cached[0] != key_b64):
+            to_import[host_id] = key_b64
+    
+    def import_keys():
+        imported = {}
+        for host_id, key_b64 in to_import.items():
+            try:
+                imported[host_id] = (key_b64, _import_key(key_b64))
+            except (ValueError, asyncssh.KeyImportError) as e:
+                print(f"Failed to import SSH key for {host_id}: {e}")
+        return imported
+    
+    imported = await asyncio.to_thread(import_keys) if to_import else {}
+    
+    _hosts_config, _config_mtime = new_config, mtime
+    _ssh_keys.update(imported)
+    for host_id in diff.removed:
+        _ssh_keys.pop(host_id, None)
+    for host_id in diff.removed + diff.reconnect:
+        await ssh_pool.close_host(host_id)
+        ssh_breakers.drop_host(host_id)
+        host_facts.drop_host(host_id)
+    
+    for callback in list(_reload_listeners):
+        try:
+            result = callback(diff)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            print(f"Hosts reload listener failed: {e}")
+    
+    print(
+        f"Hosts config reloaded: {len(diff.added)} added, {len(diff.removed)} removed, "
+        f"{len(diff.changed)} changed, {len(imported)} keys imported"
+    )
+    return diff
+
+
+async def watch_hosts_config(interval: float = HOSTS_RELOAD_INTERVAL):
+    """Poll hosts.json mtime and hot-reload on change."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await reload_hosts_config()
+        except Exception as e:
+            print(f"Hosts config reload failed: {e}")
+
+
 def get_hosts_config():
     """Get hosts configuration, loading if necessary."""
     global _hosts_config
@@ -76,32 +210,68 @@ def get_monitored_hosts():
     return monitored
 
 
-def get_ssh_key(host_id: str):
-    """Get pre-loaded SSH key for host."""
-    if host_id not in _ssh_keys:
-        # Try to load if not cached
-        get_hosts_config()
-    return _ssh_keys.get(host_id)
+async def get_ssh_key(host_id: str):
+    """Get SSH key for host, importing it in a worker thread on first use."""
+    info = get_host_info(host_id)
+    if not info:
+        return None
+    key_b64 = info.get("ssh_key_base64", "")
+    if not key_b64:
+        return None
+    cached = _ssh_keys.get(host_id)
+    if cached and cached[0] == key_b64:
+        return cached[1]
+    key = await asyncio.to_thread(_import_key, key_b64)
+    _ssh_keys[host_id] = (key_b64, key)
+    return key
 
 
-async def run_ssh_command_on_host(host_id: str, command: str) -> str:
-    """Execute command on specified host via SSH."""
+async def connect_to_host(host_id: str):
+    """Open a new SSH connection to host (used by the pool)."""
     host_info = get_host_info(host_id)
     if not host_info:
         raise ValueError(f"Unknown host: {host_id}")
     
-    ssh_key = get_ssh_key(host_id)
+    ssh_key = await get_ssh_key(host_id)
     if not ssh_key:
         raise ValueError(f"No SSH key for host: {host_id}")
     
-    async with asyncssh.connect(
+    return await asyncssh.connect(
         host_info["host"],
+        port=host_info.get("port", 22),
         username=host_info["user"],
         client_keys=[ssh_key],
-        known_hosts=None
-    ) as conn:
-        result = await conn.run(command, check=True)
-        return result.stdout
+        known_hosts=None,
+        **keepalive_options()
+    )
+
+
+async def run_ssh_commands_on_host(host_id: str, commands) -> dict:
+    """Run several commands in parallel channels of one connection to host.
+
+    Returns {command: stdout or exception}; a failing command (non-zero exit
+    or channel error) is reported as its exception without failing the rest.
+    """
+    if not get_host_info(host_id):
+        raise ValueError(f"Unknown host: {host_id}")
+    results = await ssh_pool.run_many(host_id, lambda: connect_to_host(host_id), commands, check=True)
+    return {
+        command: result if isinstance(result, BaseException) else result.stdout
+        for command, result in results.items()
+    }
+
+
+async def run_ssh_process_on_host(host_id: str, command: str, check: bool = False):
+    """Execute command on host over a pooled connection, return full result."""
+    if not get_host_info(host_id):
+        raise ValueError(f"Unknown host: {host_id}")
+    return await ssh_pool.run(host_id, lambda: connect_to_host(host_id), command, check=check)
+
+
+async def run_ssh_command_on_host(host_id: str, command: str) -> str:
+    """Execute command on specified host via SSH."""
+    result = await run_ssh_process_on_host(host_id, command, check=True)
+    return result.stdout
 
 
 # Legacy compatibility - use default host
@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import asyncio
+from dataclasses import dataclass, field
+from dotenv import load_dotenv
+from utils.telemetry import parse_seconds
+
+load_dotenv()
+
+# Seconds a fleet-wide container inventory is reused
+FLEET_CONTAINERS_TTL = float(os.getenv("FLEET_CONTAINERS_TTL", "30"))
+# Hosts queried in parallel and per-host time limit (seconds)
+FLEET_CONTAINERS_CONCURRENCY = int(os.getenv("FLEET_CONTAINERS_CONCURRENCY", "20"))
+FLEET_CONTAINERS_TIMEOUT = float(os.getenv("FLEET_CONTAINERS_TIMEOUT", "15"))
+
+# Table characters per message page, leaving room for the header and host errors
+FLEET_PAGE_CHARS = 1500
+
+# All containers, one JSON object per line
+FLEET_PS_COMMAND = "docker ps -a --format '{{json .}}'"
+
+SORT_KEYS = ("name", "host", "status", "image")
+STATUS_FILTERS = ("all", "running", "stopped", "unhealthy")
+
+# Problems first when sorting by status
+_STATE_ORDER = {"restarting": 0, "dead": 1, "exited": 2, "created": 3, "paused": 4, "running": 5}
+
+
+@dataclass
+class ContainerInfo:
+    host: str
+    name: str
+    image: str
+    state: str
+    status: str
+    ports: str = ""
+
+    @property
+    def unhealthy(self) -> bool:
+        return "unhealthy" in self.status
+
+
+def parse_ps_line(host: str, line: str) -> ContainerInfo:
+    """Parse one ``docker ps --format '{{json .}}'`` line."""
+    try:
+        data = json.loads(line)
+        status = data.get("Status", "")
+        state = data.get("State") or ("running" if status.startswith("Up") else status.split(" ")[0].lower())
+        return ContainerInfo(
+            host=host,
+            name=data["Names"],
+            image=data.get("Image", ""),
+            state=state,
+            status=status,
+            ports=data.get("Ports", ""),
+        )
+    except (KeyError, ValueError, TypeError, AttributeError) as e:
+        raise ValueError(f"Malformed docker ps line: {e}") from e
+
+
+def parse_ps_output(host: str, output: str) -> list:
+    return [parse_ps_line(host, line) for line in output.splitlines() if line.strip()]
+
+
+@dataclass
+class FleetInventory:
+    """Containers of every host at one point in time."""
+    containers: list = field(default_factory=list)
+    errors: dict = field(default_factory=dict)  # host -> error text
+    hosts: list = field(default_factory=list)
+    collected: float = 0.0
+    duration: float = 0.0
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.collected
+
+
+def filter_containers(containers, name: str = None, status: str = "all", host: str = None) -> list:
+    """Containers matching a name substring, status filter and host."""
+    name = name.lower() if name else None
+    result = []
+    for c in containers:
+        if name and name not in c.name.lower():
+            continue
+        if host and c.host != host:
+            continue
+        if status == "running" and c.state != "running":
+            continue
+        if status == "stopped" and c.state == "running":
+            continue
+        if status == "unhealthy" and not c.unhealthy:
+            continue
+        result.append(c)
+    return result
+
+
+def sort_containers(containers, key: str = "name") -> list:
+    if key == "host":
+        return sorted(containers, key=lambda c: (c.host, c.name))
+    if key == "status":
+        return sorted(containers, key=lambda c: (not c.unhealthy, _STATE_ORDER.get(c.state, 0), c.host, c.name))
+    if key == "image":
+        return sorted(containers, key=lambda c: (c.image, c.name, c.host))
+    return sorted(containers, key=lambda c: (c.name, c.host))
+
+
+def format_container_lines(containers, host_names: dict = None) -> list:
+    """Fixed-width table lines (header first) for code blocks."""
+    host_names = host_names or {}
+    lines = [f"{'HOST':<14} {'NAME':<24} {'STATUS':<22} IMAGE"]
+    for c in containers:
+        host = host_names.get(c.host, c.host)
+        lines.append(f"{host[:14]:<14} {c.name[:24]:<24} {c.status[:22]:<22} {c.image[:30]}")
+    return lines
+
+
+class FleetInventoryCache:
+    """Fleet-wide ``docker ps`` with a short TTL and in-flight de-duplication.
+
+    Every host is queried concurrently over the pooled connections; a host
+    that fails or times out is reported in ``errors`` without failing the rest.
+    """
+
+    def __init__(self, ttl: float = FLEET_CONTAINERS_TTL):
+        self.ttl = ttl
+        self._latest = None
+        self._inflight = None
+
+    def fresh(self, hosts) -> FleetInventory:
+        """The last inventory if it covers hosts and is younger than ttl, else None."""
+        latest = self._latest
+        if latest and latest.age <= self.ttl and set(latest.hosts) == set(hosts):
+            return latest
+        return None
+
+    async def get(self, hosts: dict, force: bool = False) -> FleetInventory:
+        """Inventory of hosts ({host: run(command)}), collected when stale or forced."""
+        latest = None if force else self.fresh(hosts)
+        if latest:
+            return latest
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._collect(hosts))
+            self._inflight.add_done_callback(self._collected)
+        return await asyncio.shield(self._inflight)
+
+    def _collected(self, task: asyncio.Task):
+        self._inflight = None
+        if not task.cancelled():
+            task.exception()
+
+    async def _collect(self, hosts: dict) -> FleetInventory:
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(FLEET_CONTAINERS_CONCURRENCY)
+
+        async def query(host, run):
+            async with semaphore:
+                output = await asyncio.wait_for(run(FLEET_PS_COMMAND), FLEET_CONTAINERS_TIMEOUT)
+            with parse_seconds.time(command="docker ps"):
+                return parse_ps_output(host, output)
+
+        results = await asyncio.gather(
+            *(query(host, run) for host, run in hosts.items()), return_exceptions=True
+        )
+        inventory = FleetInventory(hosts=list(hosts))
+        for host, result in zip(hosts, results):
+            if isinstance(result, BaseException):
+                if isinstance(result, asyncio.TimeoutError):
+                    inventory.errors[host] = f"timed out after {FLEET_CONTAINERS_TIMEOUT:.0f}s"
+                else:
+                    inventory.errors[host] = str(result) or type(result).__name__
+            else:
+                inventory.containers.extend(result)
+        inventory.collected = time.monotonic()
+        inventory.duration = inventory.collected - started
+        self._latest = inventory
+        return inventory
+
+    def invalidate(self):
+        self._latest = None
+
+
+# Shared inventory used by /fleet-containers
+fleet_inventory = FleetInventoryCache()
@@ -0,0 +1,36 @@
+import os
+import re
+import shlex
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Lines requested from docker logs when no --since is given
+LOGS_TAIL = int(os.getenv("LOGS_TAIL", "200"))
+# Pages kept per viewer; older pages are dropped as the reader moves on
+LOGS_MAX_PAGES = int(os.getenv("LOGS_MAX_PAGES", "50"))
+# Follow mode: seconds between message edits and total follow time
+LOGS_FOLLOW_INTERVAL = float(os.getenv("LOGS_FOLLOW_INTERVAL", "2"))
+LOGS_FOLLOW_DURATION = float(os.getenv("LOGS_FOLLOW_DURATION", "300"))
+
+CONTAINER_NAME_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+SINCE_RE = re.compile(r"^[0-9A-Za-z:.+-]+$")
+
+
+def logs_command(container: str, since: str = None, grep: str = None,
+                 follow: bool = False, tail: int = LOGS_TAIL) -> str:
+    """docker logs command with --since and grep applied on the remote side."""
+    if not CONTAINER_NAME_RE.match(container):
+        raise ValueError(f"Invalid container name: {container}")
+    args = ["docker", "logs", "--tail", str(tail)]
+    if since:
+        if not SINCE_RE.match(since):
+            raise ValueError(f"Invalid --since value: {since}")
+        args += ["--since", since]
+    if follow:
+        args.append("-f")
+    args.append(container)
+    command = " ".join(shlex.quote(a) for a in args) + " 2>&1"
+    if grep:
+        command += " | grep --line-buffered -i -E -e " + shlex.quote(grep)
+    return command
@@ -0,0 +1,175 @@
+import os
+import time
+import asyncio
+from collections import deque
+import discord
+from dotenv import load_dotenv
+from utils.telemetry import discord_send_seconds, alerts_sent_total, alert_send_failures_total, alerts_dropped_total
+
+load_dotenv()
+
+# Outbound pacing: sustained messages per second and burst size
+ALERT_SEND_RATE = float(os.getenv("ALERT_SEND_RATE", "0.5"))
+ALERT_SEND_BURST = int(os.getenv("ALERT_SEND_BURST", "5"))
+ALERT_QUEUE_MAX = int(os.getenv("ALERT_QUEUE_MAX", "1000"))
+
+# Max alerts merged into one digest embed
+DIGEST_MAX_ALERTS = 25
+DIGEST_DESCRIPTION_LIMIT = 4000
+
+LEVEL_ORDER = {"info": 0, "warning": 1, "critical": 2}
+
+
+class TokenBucket:
+    """Token bucket: ``rate`` tokens per second, up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until one token is available (0 if available now)."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+
+class AlertQueue:
+    """Non-blocking outbound alert queue for one channel.
+
+    enqueue() never waits on Discord. A worker task sends at most
+    ALERT_SEND_RATE messages per second; when several alerts are waiting
+    they are merged into one digest embed.
+    """
+
+    def __init__(self, bot, channel_id: int):
+        self.bot = bot
+        self.channel_id = channel_id
+        self.bucket = TokenBucket(ALERT_SEND_RATE, ALERT_SEND_BURST)
+        self._pending = deque(maxlen=ALERT_QUEUE_MAX)
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.sent = 0
+        self.digests = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._worker())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def enqueue(self, level: str, embed: discord.Embed):
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+            alerts_dropped_total.inc()
+        self._pending.append((level, embed))
+        self._wakeup.set()
+
+    def __len__(self):
+        return len(self._pending)
+
+    async def _worker(self):
+        await self.bot.wait_until_ready()
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            delay = self.bucket.delay()
+            if delay:
+                await asyncio.sleep(delay)
+
+            # Send one by one while tokens cover the backlog, else merge
+            batch = [self._pending.popleft()]
+            if self.bucket.tokens < len(self._pending) + 1:
+                while self._pending and len(batch) < DIGEST_MAX_ALERTS:
+                    batch.append(self._pending.popleft())
+
+            self.bucket.take()
+            try:
+                embed = batch[0][1] if len(batch) == 1 else build_digest(batch)
+                await self._send(embed, batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Never let one bad alert stop the queue
+                self._failed(batch, e)
+
+    async def _send(self, embed: discord.Embed, batch):
+        count = len(batch)
+        channel = self.bot.get_channel(self.channel_id)
+        if not channel:
+            self.failed += count
+            alert_send_failures_total.inc(count)
+            return
+        try:
+            with discord_send_seconds.time(kind="digest" if count > 1 else "alert"):
+                await channel.send(embed=embed)
+            self.sent += count
+            for level, _ in batch:
+                alerts_sent_total.inc(level=level)
+            if count > 1:
+                self.digests += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # HTTP errors, but also aiohttp/OS errors and timeouts
+            self._failed(batch, e)
+
+    def _failed(self, batch, error: Exception):
+        count = len(batch)
+        self.failed += count
+        alert_send_failures_total.inc(count)
+        print(f"Alert send failed ({count} alerts): {type(error).__name__}: {error}")
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "sent": self.sent,
+            "digests": self.digests,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+def build_digest(batch) -> discord.Embed:
+    """Merge queued (level, embed) alerts into one digest embed."""
+    worst = max(batch, key=lambda item: LEVEL_ORDER.get(item[0], 0))[0]
+    color = discord.Color.red() if worst == "critical" else discord.Color.yellow()
+
+    lines = []
+    length = 0
+    for level, embed in batch:
+        host = next((f.value for f in embed.fields if f.name == "Host"), "")
+        summary = (embed.description or "").split("\n")[0]
+        line = f"{embed.title} — **{host}**: {summary}"
+        if length + len(line) + 1 > DIGEST_DESCRIPTION_LIMIT:
+            lines.append(f"… and {len(batch) - len(lines)} more")
+            break
+        lines.append(line)
+        length += len(line) + 1
+
+    digest = discord.Embed(
+        title=f"📋 Alert digest ({len(batch)} alerts)",
+        description="\n".join(lines),
+        color=color
+    )
+    digest.set_footer(text="DevOps Bot Alert System")
+    return digest
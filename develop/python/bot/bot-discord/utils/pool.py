@@ -0,0 +1,260 @@
+import os
+import time
+import asyncio
+import asyncssh
+from dotenv import load_dotenv
+from utils.breaker import ssh_breakers, HostUnavailableError
+from utils.telemetry import ssh_connect_seconds, ssh_exec_seconds, ssh_errors_total, command_label
+
+load_dotenv()
+
+# Pool tuning (seconds unless stated otherwise)
+SSH_POOL_MAX_PER_HOST = int(os.getenv("SSH_POOL_MAX_PER_HOST", "4"))
+SSH_POOL_IDLE_TIMEOUT = float(os.getenv("SSH_POOL_IDLE_TIMEOUT", "300"))
+SSH_KEEPALIVE_INTERVAL = float(os.getenv("SSH_KEEPALIVE_INTERVAL", "30"))
+SSH_KEEPALIVE_COUNT_MAX = int(os.getenv("SSH_KEEPALIVE_COUNT_MAX", "3"))
+
+# Parallel channels per connection in run_many (sshd MaxSessions defaults to 10)
+SSH_MAX_CHANNELS = int(os.getenv("SSH_MAX_CHANNELS", "8"))
+
+# Errors that mean the pooled connection is dead and worth one reconnect
+RECONNECT_ERRORS = (
+    asyncssh.ConnectionLost,
+    asyncssh.DisconnectError,
+    asyncssh.ChannelOpenError,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+class PooledConnection:
+    """Single SSH connection tracked by the pool."""
+
+    def __init__(self, conn: asyncssh.SSHClientConnection):
+        self.conn = conn
+        self.last_used = time.monotonic()
+        self.in_use = False
+        self._closed = asyncio.ensure_future(conn.wait_closed())
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.done()
+
+    def close(self):
+        self.conn.close()
+
+
+class SSHConnectionPool:
+    """Per-host pool of persistent SSH connections.
+
+    Connections are keyed by an arbitrary string (host id or user@host),
+    kept alive with SSH keepalives, evicted after being idle for
+    ``idle_timeout`` seconds and capped at ``max_per_host`` per key.
+    Callers that hit the cap wait until a connection is released.
+    """
+
+    def __init__(self, max_per_host: int = SSH_POOL_MAX_PER_HOST,
+                 idle_timeout: float = SSH_POOL_IDLE_TIMEOUT):
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self._pools = {}
+        self._conditions = {}
+        self._connecting = {}
+        self._reaper = None
+        self.hits = 0
+        self.misses = 0
+        self.reconnects = 0
+
+    def _condition(self, key: str) -> asyncio.Condition:
+        if key not in self._conditions:
+            self._conditions[key] = asyncio.Condition()
+        return self._conditions[key]
+
+    def _start_reaper(self):
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_idle())
+
+    async def _reap_idle(self):
+        """Close connections that have been idle longer than idle_timeout."""
+        while True:
+            await asyncio.sleep(max(self.idle_timeout / 2, 1))
+            now = time.monotonic()
+            for key, entries in list(self._pools.items()):
+                for entry in list(entries):
+                    if entry.in_use:
+                        continue
+                    if entry.closed or now - entry.last_used > self.idle_timeout:
+                        entries.remove(entry)
+                        entry.close()
+                if not entries and not self._connecting.get(key):
+                    self._pools.pop(key, None)
+
+    async def acquire(self, key: str, connect) -> PooledConnection:
+        """Lease a connection for key, opening one via connect() if needed.
+
+        New connections go through the host's circuit breaker, so a host that
+        is down fails fast with HostUnavailableError.
+        """
+        self._start_reaper()
+        cond = self._condition(key)
+        async with cond:
+            while True:
+                entries = self._pools.setdefault(key, [])
+                for entry in list(entries):
+                    if entry.closed:
+                        entries.remove(entry)
+                        continue
+                    if not entry.in_use:
+                        entry.in_use = True
+                        self.hits += 1
+                        return entry
+                if len(entries) + self._connecting.get(key, 0) < self.max_per_host:
+                    self._connecting[key] = self._connecting.get(key, 0) + 1
+                    break
+                await cond.wait()
+
+        self.misses += 1
+        started = time.perf_counter()
+        try:
+            conn = await ssh_breakers.connect(key, connect)
+        except BaseException as e:
+            if not isinstance(e, HostUnavailableError):
+                ssh_errors_total.inc(host=key, stage="connect")
+            async with cond:
+                self._connecting[key] -= 1
+                cond.notify()
+            raise
+
+        ssh_connect_seconds.observe(time.perf_counter() - started, host=key)
+        entry = PooledConnection(conn)
+        entry.in_use = True
+        async with cond:
+            self._connecting[key] -= 1
+            self._pools.setdefault(key, []).append(entry)
+        return entry
+
+    async def release(self, key: str, entry: PooledConnection, discard: bool = False):
+        """Return a leased connection, closing it if discard is set."""
+        cond = self._condition(key)
+        async with cond:
+            entry.in_use = False
+            entry.last_used = time.monotonic()
+            if discard or entry.closed:
+                entries = self._pools.get(key, [])
+                if entry in entries:
+                    entries.remove(entry)
+                entry.close()
+            cond.notify()
+
+    async def lease(self, key: str, connect):
+        """Lease a connection for long-lived use such as a streamed process.
+
+        Returns (conn, release); await release() when done. The connection
+        goes back to the pool unless it died.
+        """
+        entry = await self.acquire(key, connect)
+
+        async def release():
+            await self.release(key, entry, discard=entry.closed)
+        return entry.conn, release
+
+    async def run(self, key: str, connect, command: str, check: bool = True):
+        """Run command on a pooled connection, reconnecting once if it died."""
+        label = command_label(command)
+        for attempt in range(2):
+            entry = await self.acquire(key, connect)
+            started = time.perf_counter()
+            try:
+                result = await entry.conn.run(command, check=check)
+            except RECONNECT_ERRORS:
+                ssh_errors_total.inc(host=key, stage="exec")
+                await self.release(key, entry, discard=True)
+                if attempt:
+                    raise
+                self.reconnects += 1
+                continue
+            except BaseException:
+                await self.release(key, entry, discard=entry.closed)
+                raise
+            ssh_exec_seconds.observe(time.perf_counter() - started, host=key, command=label)
+            await self.release(key, entry)
+            return result
+
+    async def run_many(self, key: str, connect, commands, check: bool = True) -> dict:
+        """Run commands as parallel channels on one pooled connection.
+
+        Returns {command: SSHCompletedProcess or exception}; one failing
+        command does not affect the others. Commands that failed because the
+        connection died are retried once on a new connection; if that
+        reconnect fails, its error is their result.
+        """
+        results = {}
+        pending = list(dict.fromkeys(commands))
+        for attempt in range(2):
+            try:
+                entry = await self.acquire(key, connect)
+            except Exception as e:
+                if not attempt:
+                    raise
+                # Reconnect failed: report it for the lost commands, keep the rest
+                results.update((command, e) for command in pending)
+                break
+            channels = asyncio.Semaphore(SSH_MAX_CHANNELS)
+
+            async def run_one(command):
+                async with channels:
+                    started = time.perf_counter()
+                    result = await entry.conn.run(command, check=check)
+                    ssh_exec_seconds.observe(time.perf_counter() - started,
+                                             host=key, command=command_label(command))
+                    return result
+
+            try:
+                outcomes = await asyncio.gather(*(run_one(c) for c in pending), return_exceptions=True)
+            except BaseException:
+                await self.release(key, entry, discard=entry.closed)
+                raise
+            lost = [c for c, r in zip(pending, outcomes) if isinstance(r, RECONNECT_ERRORS)]
+            results.update(zip(pending, outcomes))
+            await self.release(key, entry, discard=bool(lost) or entry.closed)
+            if not lost or attempt:
+                break
+            ssh_errors_total.inc(host=key, stage="exec")
+            self.reconnects += 1
+            pending = lost
+        return results
+
+    async def close_host(self, key: str):
+        """Close every pooled connection for key."""
+        for entry in self._pools.pop(key, []):
+            entry.close()
+
+    async def close_all(self):
+        """Close all pooled connections and stop the idle reaper."""
+        if self._reaper:
+            self._reaper.cancel()
+            self._reaper = None
+        for key in list(self._pools):
+            await self.close_host(key)
+
+    def stats(self) -> dict:
+        """Return pool hit/miss counters and open connection counts."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "reconnects": self.reconnects,
+            "open": {key: len(entries) for key, entries in self._pools.items()},
+            "breakers": ssh_breakers.stats(),
+        }
+
+
+def keepalive_options() -> dict:
+    """asyncssh.connect keyword arguments for pooled connections."""
+    return {
+        "keepalive_interval": SSH_KEEPALIVE_INTERVAL,
+        "keepalive_count_max": SSH_KEEPALIVE_COUNT_MAX,
+    }
+
+
+# Shared pool used by every cog
+ssh_pool = SSHConnectionPool()
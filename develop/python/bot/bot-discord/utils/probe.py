@@ -0,0 +1,121 @@
+import math
+from dataclasses import dataclass
+from utils.facts import host_facts, READ_BOOT_ID, FACTS_COMMAND
+from utils.telemetry import parse_seconds
+
+# Bump when the payload format changes; the parser rejects other versions
+PROBE_VERSION = 2
+
+# Single remote exec that reads only the volatile counters the health check
+# needs; CPU count and total memory come from the host facts cache. Uses
+# shell builtins for /proc parsing so only stat is forked.
+PROBE_COMMAND = (
+    f"echo v={PROBE_VERSION}; "
+    + READ_BOOT_ID + "echo boot_id=$b; "
+    "while read k v _; do case $k in "
+    "MemAvailable:) echo mem_available=$v; break;; "
+    "esac; done < /proc/meminfo; "
+    "read l1 l5 l15 _ < /proc/loadavg; echo \"load=$l1 $l5 $l15\"; "
+    "stat -f -c 'disk=%b %f %a %S' /"
+)
+
+
+@dataclass
+class HostHealth:
+    """Parsed result of PROBE_COMMAND."""
+    cpus: int
+    mem_total_kb: int
+    mem_available_kb: int
+    load1: float
+    load5: float
+    load15: float
+    disk_blocks: int
+    disk_free: int
+    disk_avail: int
+    disk_block_size: int
+
+    @property
+    def ram_percent(self) -> float:
+        if not self.mem_total_kb:
+            return 0.0
+        return (self.mem_total_kb - self.mem_available_kb) / self.mem_total_kb * 100
+
+    @property
+    def disk_usage(self) -> float:
+        """Unrounded disk_percent, for trends and projections."""
+        used = self.disk_blocks - self.disk_free
+        total = used + self.disk_avail
+        if not total:
+            return 0.0
+        return used * 100 / total
+
+    @property
+    def disk_percent(self) -> float:
+        # Same formula as df: used / (used + available to non-root), rounded up
+        return float(math.ceil(self.disk_usage))
+
+    @property
+    def cpu_percent(self) -> float:
+        """1 minute load average relative to CPU count."""
+        return self.load1 / max(self.cpus, 1) * 100
+
+
+def _probe_values(output: str) -> dict:
+    values = {}
+    for line in output.strip().splitlines():
+        key, sep, value = line.partition("=")
+        if sep:
+            values[key.strip()] = value.strip()
+    return values
+
+
+def parse_probe(output: str, facts) -> HostHealth:
+    """Parse key=value payload produced by PROBE_COMMAND, completed with HostFacts."""
+    values = _probe_values(output)
+
+    version = values.get("v")
+    if version != str(PROBE_VERSION):
+        raise ValueError(f"Unsupported probe version: {version}")
+
+    try:
+        load = values["load"].split()
+        disk = values["disk"].split()
+        return HostHealth(
+            cpus=facts.cpus,
+            mem_total_kb=facts.mem_total_kb,
+            mem_available_kb=int(values["mem_available"]),
+            load1=float(load[0]),
+            load5=float(load[1]),
+            load15=float(load[2]),
+            disk_blocks=int(disk[0]),
+            disk_free=int(disk[1]),
+            disk_avail=int(disk[2]),
+            disk_block_size=int(disk[3]),
+        )
+    except (KeyError, IndexError, ValueError) as e:
+        raise ValueError(f"Malformed probe output: {e}") from e
+
+
+async def probe_host(key: str, run, run_many=None) -> HostHealth:
+    """Run PROBE_COMMAND with run(command) and combine it with key's facts.
+
+    Facts are collected on first use; a boot_id other than the cached one
+    (the host rebooted) re-collects them before parsing. With run_many
+    (batch of commands -> {command: output or exception}) missing facts and
+    the probe are fetched as parallel channels in one round trip.
+    """
+    if run_many and not host_facts.fresh(key):
+        outputs = await run_many([FACTS_COMMAND, PROBE_COMMAND])
+        for result in outputs.values():
+            if isinstance(result, BaseException):
+                raise result
+        facts = host_facts.store(key, outputs[FACTS_COMMAND])
+        output = outputs[PROBE_COMMAND]
+    else:
+        facts = await host_facts.get(key, run)
+        output = await run(PROBE_COMMAND)
+    boot_id = _probe_values(output).get("boot_id")
+    if boot_id and boot_id != facts.boot_id:
+        facts = await host_facts.get(key, run, boot_id=boot_id)
+    with parse_seconds.time(command="probe"):
+        return parse_probe(output, facts)
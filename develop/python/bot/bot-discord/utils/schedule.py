@@ -0,0 +1,167 @@
+import os
+import time
+import hashlib
+import random
+from dataclasses import dataclass
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# How often the alerts loop looks for due hosts (seconds)
+ALERT_SCHEDULER_TICK = float(os.getenv("ALERT_SCHEDULER_TICK", "1"))
+
+# Random +/- fraction applied to every interval so hosts do not re-align
+ALERT_JITTER = float(os.getenv("ALERT_JITTER", "0.05"))
+
+# Default per-host interval bounds (seconds), overridable per host in hosts.json.
+# Unset ALERT_MAX_INTERVAL means ALERT_MAX_INTERVAL_FACTOR times check_interval.
+ALERT_MIN_INTERVAL = float(os.getenv("ALERT_MIN_INTERVAL", "30"))
+ALERT_MAX_INTERVAL = float(os.getenv("ALERT_MAX_INTERVAL") or 0) or None
+ALERT_MAX_INTERVAL_FACTOR = float(os.getenv("ALERT_MAX_INTERVAL_FACTOR", "4"))
+
+# Interval multiplier per stable check
+ALERT_BACKOFF_FACTOR = float(os.getenv("ALERT_BACKOFF_FACTOR", "1.5"))
+
+# Headroom (fraction of threshold) below which a host counts as near its threshold
+ALERT_NEAR_THRESHOLD = float(os.getenv("ALERT_NEAR_THRESHOLD", "0.15"))
+
+
+@dataclass
+class HostSchedule:
+    interval: float
+    next_due: float = 0.0
+    running: bool = False
+    last_checked: float = None
+    headroom: float = None
+
+
+def default_max_interval(base_interval: float) -> float:
+    """Upper interval bound when hosts.json does not set one."""
+    return ALERT_MAX_INTERVAL or base_interval * ALERT_MAX_INTERVAL_FACTOR
+
+
+def clamp_interval(interval: float, min_interval: float, max_interval: float) -> float:
+    return min(max(interval, min_interval), max_interval)
+
+
+def phase_offset(host: str, interval: float) -> float:
+    """Stable offset of host within interval, from a hash of the host id."""
+    digest = hashlib.sha1(host.encode()).digest()
+    return int.from_bytes(digest[:4], "big") / 2 ** 32 * interval
+
+
+def jittered(interval: float) -> float:
+    return interval * (1 + random.uniform(-ALERT_JITTER, ALERT_JITTER))
+
+
+def headroom(values: dict, thresholds: dict) -> float:
+    """Smallest relative distance to a threshold, e.g. 0.1 = 10% below it."""
+    # No non-zero threshold means nothing to get close to
+    return min(
+        ((thresholds[m] - v) / thresholds[m]
+         for m, v in values.items() if thresholds.get(m)),
+        default=1.0,
+    )
+
+
+class AdaptiveScheduler:
+    """Per-host check intervals between min and max bounds.
+
+    Each host gets a stable phase offset within the base interval, so checks
+    arrive as a steady stream instead of one burst per interval; the next
+    check is planned from the previous due time (plus jitter) to keep that
+    phase. Hosts start at the base interval. Near a threshold (or while alerting)
+    the interval shrinks linearly towards the minimum; while a host stays
+    well below its thresholds the interval grows by ALERT_BACKOFF_FACTOR
+    per check up to the maximum.
+    """
+
+    def __init__(self, base_interval: float):
+        self.base_interval = base_interval
+        self.hosts = {}
+
+    def get(self, host: str) -> HostSchedule:
+        if host not in self.hosts:
+            first = time.monotonic() + phase_offset(host, self.base_interval)
+            self.hosts[host] = HostSchedule(self.base_interval, first)
+        return self.hosts[host]
+
+    def due(self, hosts, now: float = None) -> list:
+        """Hosts whose next check is due; they are marked as running."""
+        if now is None:
+            now = time.monotonic()
+        due = []
+        for host in hosts:
+            schedule = self.get(host)
+            if not schedule.running and schedule.next_due <= now:
+                schedule.running = True
+                due.append(host)
+        return due
+
+    def claim(self, hosts) -> list:
+        """Hosts without a check in flight, marked as running regardless of
+        their due time (manual checks)."""
+        claimed = []
+        for host in hosts:
+            schedule = self.get(host)
+            if not schedule.running:
+                schedule.running = True
+                claimed.append(host)
+        return claimed
+
+    def _plan_next(self, schedule: HostSchedule, now: float):
+        schedule.running = False
+        next_due = schedule.next_due + jittered(schedule.interval)
+        if next_due <= now:
+            # Fell behind (slow check or shorter interval): restart from now
+            next_due = now + jittered(schedule.interval)
+        schedule.next_due = next_due
+
+    def release(self, host: str):
+        """Finish a check that did not call update() (failure or cancel)."""
+        schedule = self.hosts.get(host)
+        if schedule and schedule.running:
+            self._plan_next(schedule, time.monotonic())
+
+    def update(self, host: str, room: float, alerting: bool,
+               min_interval: float = ALERT_MIN_INTERVAL,
+               max_interval: float = None, now: float = None) -> float:
+        """Record a finished check and return the next interval."""
+        if now is None:
+            now = time.monotonic()
+        if max_interval is None:
+            max_interval = default_max_interval(self.base_interval)
+        schedule = self.get(host)
+        base = clamp_interval(self.base_interval, min_interval, max_interval)
+        if alerting or room <= 0:
+            interval = min_interval
+        elif room < ALERT_NEAR_THRESHOLD:
+            interval = min_interval + (base - min_interval) * room / ALERT_NEAR_THRESHOLD
+        elif schedule.interval < base:
+            interval = base
+        else:
+            interval = schedule.interval * ALERT_BACKOFF_FACTOR
+        schedule.interval = clamp_interval(interval, min_interval, max_interval)
+        schedule.headroom = room
+        schedule.last_checked = now
+        self._plan_next(schedule, now)
+        return schedule.interval
+
+    def reset(self, host: str, min_interval: float = ALERT_MIN_INTERVAL,
+              max_interval: float = None):
+        """Return host to the base interval within its bounds (e.g. after a failed check)."""
+        if max_interval is None:
+            max_interval = default_max_interval(self.base_interval)
+        schedule = self.get(host)
+        schedule.interval = clamp_interval(self.base_interval, min_interval, max_interval)
+        schedule.headroom = None
+
+    def set_base_interval(self, base_interval: float):
+        self.base_interval = base_interval
+        now = time.monotonic()
+        for host, schedule in self.hosts.items():
+            schedule.interval = base_interval
+            schedule.next_due = now + phase_offset(host, base_interval)
+
+    def drop_host(self, host: str):
+        self.hosts.pop(host, None)
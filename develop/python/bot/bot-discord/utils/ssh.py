@@ -2,6 +2,7 @@ import os
 import base64
 import asyncssh
 from dotenv import load_dotenv
+from utils.pool import ssh_pool, keepalive_options
 
 load_dotenv()
 
@@ -10,9 +11,17 @@ HOSTS_CONFIG_PATH = os.getenv("HOSTS_CONFIG_PATH", "")
 
 if HOSTS_CONFIG_PATH and os.path.exists(HOSTS_CONFIG_PATH):
     # New multi-host mode
-    from utils.hosts import get_default_host_address, run_ssh_command_on_host, get_default_host
+    from utils.hosts import get_default_host_address, run_ssh_command_on_host, get_default_host, connect_to_host
     
     SSH_HOST = get_default_host_address()
+
+    def default_host_key() -> str:
+        """Key of the default host in pools and collectors."""
+        return get_default_host()
+
+    def connect_default_host():
+        """Open a dedicated (non-pooled) connection to the default host."""
+        return connect_to_host(get_default_host())
     
     async def run_ssh_command(command: str, host: str = None, user: str = None) -> str:
         """Execute command on remote host via SSH."""
@@ -35,16 +44,29 @@ else:
     else:
         _ssh_key = None
 
+    def _connect(host: str, user: str):
+        return asyncssh.connect(
+            host,
+            username=user,
+            client_keys=[_ssh_key],
+            known_hosts=None,
+            **keepalive_options()
+        )
+
+    def default_host_key() -> str:
+        """Key of the default host in pools and collectors."""
+        return SSH_HOST
+
+    def connect_default_host():
+        """Open a dedicated (non-pooled) connection to the default host."""
+        return _connect(SSH_HOST, SSH_USER)
+
     async def run_ssh_command(command: str, host: str = None, user: str = None) -> str:
         """Execute command on remote host via SSH."""
         host = host or SSH_HOST
         user = user or SSH_USER
-        
-        async with asyncssh.connect(
-            host,
-            username=user,
-            client_keys=[_ssh_key],
-            known_hosts=None
-        ) as conn:
-            result = await conn.run(command, check=True)
-            return result.stdout
+        # The default host shares default_host_key() with ping, facts and
+        # snapshots, so it has one pool and one circuit breaker
+        key = default_host_key() if (host, user) == (SSH_HOST, SSH_USER) else f"{user}@{host}"
+        result = await ssh_pool.run(key, lambda: _connect(host, user), command, check=True)
+        return result.stdout
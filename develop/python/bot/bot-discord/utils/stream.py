@@ -0,0 +1,225 @@
+import os
+import time
+import asyncio
+from dataclasses import dataclass
+from dotenv import load_dotenv
+from utils.probe import HostHealth
+from utils.breaker import ssh_breakers, PERMANENT_EXIT_STATUSES
+from utils.telemetry import parse_seconds
+
+load_dotenv()
+
+METRICS_STREAM_ENABLED = os.getenv("METRICS_STREAM_ENABLED", "false").lower() in ("1", "true", "yes")
+METRICS_STREAM_INTERVAL = int(os.getenv("METRICS_STREAM_INTERVAL", "10"))
+METRICS_STREAM_MAX_AGE = float(os.getenv("METRICS_STREAM_MAX_AGE", str(METRICS_STREAM_INTERVAL * 3)))
+METRICS_STREAM_BACKOFF_MAX = float(os.getenv("METRICS_STREAM_BACKOFF_MAX", "300"))
+
+# Bump when the sample line format changes
+SAMPLER_VERSION = 1
+
+# Re-read statvfs only every N samples, disk usage moves slowly
+DISK_EVERY = 6
+
+
+def sampler_command(interval: int = METRICS_STREAM_INTERVAL) -> str:
+    """Remote shell loop printing one compact sample line every interval seconds.
+
+    Line format (space separated):
+    version uptime cpus mem_total mem_avail load1 load5 load15
+    user nice system idle iowait irq softirq steal
+    disk_blocks disk_free disk_avail disk_bsize net_rx net_tx
+    """
+    return (
+        "c=$(nproc); n=0; "
+        "while :; do "
+        f"if [ $((n % {DISK_EVERY})) -eq 0 ]; then d=$(stat -f -c '%b %f %a %S' /); fi; n=$((n+1)); "
+        "while read k v _; do case $k in "
+        "MemTotal:) mt=$v;; MemAvailable:) ma=$v;; esac; done < /proc/meminfo; "
+        "read up _ < /proc/uptime; read l1 l5 l15 _ < /proc/loadavg; "
+        "read _ cu cn cs ci cw cq csq cst _ < /proc/stat; "
+        "rx=0; tx=0; { read _; read _; while read l; do i=${l%%:*}; set -- ${l#*:}; "
+        "[ \"$i\" = lo ] || { rx=$((rx+$1)); tx=$((tx+$9)); }; done; } < /proc/net/dev; "
+        f"echo {SAMPLER_VERSION} $up $c $mt $ma $l1 $l5 $l15 "
+        "$cu $cn $cs $ci ${cw:-0} ${cq:-0} ${csq:-0} ${cst:-0} $d $rx $tx; "
+        f"sleep {interval}; "
+        "done"
+    )
+
+
+@dataclass
+class StreamSample(HostHealth):
+    """Health sample from the streaming sampler, with rates from the previous sample."""
+    uptime: float
+    received: float
+    cpu_busy_percent: float
+    net_rx_rate: float
+    net_tx_rate: float
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.received
+
+
+def parse_sample_line(line: str, previous: "tuple | None"):
+    """Parse a sampler line.
+
+    Returns (sample, counters) where counters is the raw
+    (uptime, busy_jiffies, total_jiffies, rx, tx) tuple to pass back in
+    as previous for the next line.
+    """
+    parts = line.split()
+    if not parts or parts[0] != str(SAMPLER_VERSION):
+        raise ValueError(f"Unsupported sampler line: {line[:40]!r}")
+    if len(parts) != 22:
+        raise ValueError(f"Malformed sampler line: {line[:40]!r}")
+
+    ts = float(parts[1])
+    jiffies = [int(p) for p in parts[8:16]]
+    idle = jiffies[3] + jiffies[4]
+    total = sum(jiffies)
+    rx, tx = int(parts[20]), int(parts[21])
+    counters = (ts, total - idle, total, rx, tx)
+
+    cpu_busy = net_rx_rate = net_tx_rate = 0.0
+    if previous:
+        p_ts, p_busy, p_total, p_rx, p_tx = previous
+        d_total = total - p_total
+        if d_total > 0:
+            cpu_busy = (counters[1] - p_busy) / d_total * 100
+        d_ts = ts - p_ts
+        if d_ts > 0:
+            net_rx_rate = max(rx - p_rx, 0) / d_ts
+            net_tx_rate = max(tx - p_tx, 0) / d_ts
+
+    sample = StreamSample(
+        cpus=int(parts[2]),
+        mem_total_kb=int(parts[3]),
+        mem_available_kb=int(parts[4]),
+        load1=float(parts[5]),
+        load5=float(parts[6]),
+        load15=float(parts[7]),
+        disk_blocks=int(parts[16]),
+        disk_free=int(parts[17]),
+        disk_avail=int(parts[18]),
+        disk_block_size=int(parts[19]),
+        uptime=ts,
+        received=time.monotonic(),
+        cpu_busy_percent=cpu_busy,
+        net_rx_rate=net_rx_rate,
+        net_tx_rate=net_tx_rate,
+    )
+    return sample, counters
+
+
+class HostStream:
+    """Long-lived sampler session for one host with reconnect backoff.
+
+    Connects through the host's circuit breaker; stops for good when the
+    sampler cannot run on the host.
+    """
+
+    def __init__(self, host_id: str, connect, interval: int = METRICS_STREAM_INTERVAL):
+        self.host_id = host_id
+        self.connect = connect
+        self.interval = interval
+        self.latest = None
+        self.last_error = None
+        self.reconnects = 0
+        self.stopped = False
+        self._task = None
+        self._listeners = []
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def add_listener(self, callback):
+        """Call callback(host_id, sample) for every parsed sample."""
+        self._listeners.append(callback)
+
+    async def _run(self):
+        backoff = 1.0
+        while True:
+            try:
+                async with await ssh_breakers.connect(self.host_id, self.connect) as conn:
+                    async with conn.create_process(sampler_command(self.interval)) as process:
+                        previous = None
+                        async for line in process.stdout:
+                            try:
+                                with parse_seconds.time(command="sampler"):
+                                    sample, previous = parse_sample_line(line, previous)
+                            except ValueError as e:
+                                self.last_error = str(e)
+                                continue
+                            self.latest = sample
+                            backoff = 1.0
+                            for callback in self._listeners:
+                                callback(self.host_id, sample)
+                        await process.wait()
+                self.last_error = "sampler exited"
+                if process.exit_status in PERMANENT_EXIT_STATUSES:
+                    self.last_error = f"sampler exited with status {process.exit_status}"
+                    self.stopped = True
+                    return
+            except asyncio.CancelledError:
+                raise
+            except ValueError as e:
+                # Unknown host or missing key: reconnecting cannot help
+                self.last_error = str(e)
+                self.stopped = True
+                return
+            except Exception as e:
+                self.last_error = str(e)
+
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, METRICS_STREAM_BACKOFF_MAX)
+
+
+class StreamManager:
+    """Keeps one HostStream per host and serves their latest samples."""
+
+    def __init__(self):
+        self.streams = {}
+        self._listeners = []
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+        for stream in self.streams.values():
+            stream.add_listener(callback)
+
+    def start_host(self, host_id: str, connect):
+        if host_id in self.streams:
+            return
+        stream = HostStream(host_id, connect)
+        for callback in self._listeners:
+            stream.add_listener(callback)
+        self.streams[host_id] = stream
+        stream.start()
+
+    def stop_host(self, host_id: str):
+        stream = self.streams.pop(host_id, None)
+        if stream:
+            stream.stop()
+
+    def stop_all(self):
+        for host_id in list(self.streams):
+            self.stop_host(host_id)
+
+    def latest(self, host_id: str, max_age: float = METRICS_STREAM_MAX_AGE):
+        """Latest sample for host if it is fresher than max_age seconds."""
+        stream = self.streams.get(host_id)
+        if not stream or not stream.latest:
+            return None
+        if stream.latest.age > max_age:
+            return None
+        return stream.latest
+
+
+# Shared stream manager, started by cogs/metrics_stream.py when enabled
+metrics_stream = StreamManager()
@@ -0,0 +1,125 @@
+import os
+import time
+import asyncssh
+from dotenv import load_dotenv
+from utils.pool import ssh_pool
+from utils.telemetry import stream_first_output_seconds, command_label
+
+load_dotenv()
+
+# Streamed replies: seconds between message edits and max streaming time
+STREAM_EDIT_INTERVAL = float(os.getenv("STREAM_EDIT_INTERVAL", "1"))
+STREAM_MAX_DURATION = float(os.getenv("STREAM_MAX_DURATION", "300"))
+
+# Characters of output per message (message limit minus code block and header)
+OUTPUT_PAGE_CHARS = 1800
+
+
+def clean_output_line(line: str) -> str:
+    """Make an output line safe inside a Discord code block."""
+    return line.rstrip("\r\n").replace("```", "'''")
+
+
+def dedicated(connect):
+    """Connection source that opens a new connection and closes it after use.
+
+    For long-lived streams (followed logs) that should not hold a pool slot.
+    """
+    async def open_connection():
+        conn = await connect()
+
+        async def release():
+            conn.close()
+        return conn, release
+    return open_connection
+
+
+def pooled(key: str, connect):
+    """Connection source that leases a pooled connection for key."""
+    return lambda: ssh_pool.lease(key, connect)
+
+
+class OutputReader:
+    """Reads remote command output line by line and cuts it into pages.
+
+    Output is only pulled from the SSH channel when the next line or page
+    is requested, so large outputs are never buffered in full. open_connection
+    is a connection source (see dedicated() and pooled()).
+    """
+
+    def __init__(self, open_connection, command: str, page_chars: int = OUTPUT_PAGE_CHARS):
+        self.open_connection = open_connection
+        self.command = command
+        self.page_chars = page_chars
+        self.exhausted = False
+        self.started = None
+        self.first_output = None
+        self._release = None
+        self._process = None
+        self._pending = None
+
+    async def open(self):
+        self.started = time.perf_counter()
+        conn, self._release = await self.open_connection()
+        try:
+            self._process = await conn.create_process(self.command, stderr=asyncssh.STDOUT)
+        except BaseException:
+            await self.close()
+            raise
+
+    @property
+    def exit_status(self):
+        return self._process.exit_status if self._process else None
+
+    async def readline(self):
+        """Next cleaned line, or None at end of output."""
+        if self._pending is not None:
+            line, self._pending = self._pending, None
+            return line
+        if self.exhausted:
+            return None
+        try:
+            raw = await self._process.stdout.readline()
+        except (asyncssh.Error, OSError):
+            raw = ""
+        if not raw:
+            self.exhausted = True
+            return None
+        if self.first_output is None:
+            self.first_output = time.perf_counter() - self.started
+            stream_first_output_seconds.observe(self.first_output, command=command_label(self.command))
+        return clean_output_line(raw)
+
+    async def read_page(self):
+        """Next page of text, or None when the output is exhausted."""
+        lines = []
+        size = 0
+        while True:
+            line = await self.readline()
+            if line is None:
+                break
+            if len(line) > self.page_chars:
+                # Split very long lines across pages
+                line, self._pending = line[:self.page_chars], line[self.page_chars:]
+            if size + len(line) + 1 > self.page_chars and lines:
+                self._pending = line if self._pending is None else line + self._pending
+                break
+            lines.append(line)
+            size += len(line) + 1
+        if lines and self._pending is None:
+            # Look ahead one line so exhausted is accurate after this page
+            self._pending = await self.readline()
+        return "\n".join(lines) if lines else None
+
+    async def close(self):
+        self.exhausted = True
+        if self._process:
+            self._process.close()
+            # Let the channel finish so a pooled connection is clean for reuse
+            try:
+                await self._process.wait_closed()
+            except (asyncssh.Error, OSError):
+                pass
+        if self._release:
+            release, self._release = self._release, None
+            await release()
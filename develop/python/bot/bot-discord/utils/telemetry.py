@@ -0,0 +1,181 @@
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from aiohttp import web
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# /metrics HTTP endpoint (Prometheus text format), port 0 disables it
+METRICS_HOST = os.getenv("METRICS_HOST", "0.0.0.0")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9200"))
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Max length of the command label derived from a shell command
+COMMAND_LABEL_MAX = 32
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs += [f'{n}="{_escape(v)}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        for key, value in self._values.items():
+            yield f"{self.name}{_labels(self.labelnames, key)} {_format(value)}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        data = self._values.get(key)
+        if data is None:
+            data = self._values[key] = [0] * (len(self.buckets) + 2)
+        i = bisect_left(self.buckets, value)
+        if i < len(self.buckets):
+            data[i] += 1
+        data[-2] += value
+        data[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a with-block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        for key, data in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, data):
+                cumulative += count
+                labels = _labels(self.labelnames, key, (("le", _format(bound)),))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _labels(self.labelnames, key, (("le", "+Inf"),))
+            yield f"{self.name}_bucket{labels} {data[-1]}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_format(data[-2])}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {data[-1]}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+ssh_connect_seconds = registry.register(Histogram(
+    "bot_ssh_connect_seconds", "SSH connection setup time", ("host",)))
+ssh_exec_seconds = registry.register(Histogram(
+    "bot_ssh_exec_seconds", "Remote command execution time", ("host", "command")))
+ssh_errors_total = registry.register(Counter(
+    "bot_ssh_errors_total", "Failed SSH connects and commands", ("host", "stage")))
+parse_seconds = registry.register(Histogram(
+    "bot_parse_seconds", "Time spent parsing command output", ("command",)))
+discord_send_seconds = registry.register(Histogram(
+    "bot_discord_send_seconds", "Discord message send latency", ("kind",)))
+check_loop_lag_seconds = registry.register(Histogram(
+    "bot_check_loop_lag_seconds", "Delay of check_system runs behind schedule"))
+check_cycle_seconds = registry.register(Histogram(
+    "bot_check_cycle_seconds", "Duration of a manual /alerts-check cycle over all hosts"))
+host_check_seconds = registry.register(Histogram(
+    "bot_host_check_seconds", "Duration of one host check, scheduled or manual", ("host",)))
+alerts_sent_total = registry.register(Counter(
+    "bot_alerts_sent_total", "Alerts delivered to Discord", ("level",)))
+alert_send_failures_total = registry.register(Counter(
+    "bot_alert_send_failures_total", "Alerts that could not be delivered"))
+alerts_dropped_total = registry.register(Counter(
+    "bot_alerts_dropped_total", "Alerts dropped because the queue was full"))
+stream_first_output_seconds = registry.register(Histogram(
+    "bot_stream_first_output_seconds", "Time from starting a streamed command to its first output line",
+    ("command",)))
+check_timeouts_total = registry.register(Counter(
+    "bot_check_timeouts_total", "Host checks that hit the per-host or cycle timeout", ("host",)))
+
+
+def command_label(command: str) -> str:
+    """Low-cardinality label for a shell command (no arguments)."""
+    if command.startswith("echo v="):
+        return "probe"
+    if command.startswith("echo @@"):
+        return "snapshot"
+    if command.startswith("echo facts="):
+        return "facts"
+    words = command.split()
+    if not words:
+        return ""
+    label = words[0]
+    if label == "docker" and len(words) > 1:
+        label = f"docker {words[1]}"
+    return label[:COMMAND_LABEL_MAX]
+
+
+async def handle_metrics(request):
+    return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8")
+
+
+async def start_metrics_server(host: str = METRICS_HOST, port: int = METRICS_PORT):
+    """Serve /metrics on host:port; returns the runner (cleanup() to stop) or None."""
+    if not port:
+        return None
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    print(f"Metrics endpoint listening on {host}:{port}/metrics")
+    return runner
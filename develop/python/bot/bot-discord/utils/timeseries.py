@@ -0,0 +1,187 @@
+import os
+import time
+from array import array
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Raw tier: resolution and retention in seconds (default 1h at 10s, which
+# covers the 1h trend window at live stream cadence)
+TIMESERIES_RESOLUTION = int(os.getenv("TIMESERIES_RESOLUTION", "10"))
+TIMESERIES_RETENTION = int(os.getenv("TIMESERIES_RETENTION", "3600"))
+
+# Downsampled tiers: (resolution seconds, slots) -> 5m for 24h, 1h for 7d.
+# Alert checks run every 30-1800s, so finer tiers would stay mostly empty.
+# About 17 KB per series with the defaults (51 KB per host for 3 metrics).
+DOWNSAMPLE_TIERS = ((300, 288), (3600, 168))
+
+# Metrics recorded from HostHealth / StreamSample
+HEALTH_METRICS = ("ram", "disk", "cpu")
+
+_EMPTY = -1
+
+
+class RingBuffer:
+    """Fixed-size ring of one float per time slot.
+
+    Slot index is ``int(ts // resolution) % size``; a parallel array keeps
+    the absolute slot number so stale slots from a previous lap are ignored.
+    """
+
+    def __init__(self, resolution: int, size: int):
+        self.resolution = resolution
+        self.size = size
+        self.values = array("f", bytes(4 * size))
+        self.slots = array("q", [_EMPTY]) * size
+
+    def add(self, ts: float, value: float):
+        slot = int(ts // self.resolution)
+        i = slot % self.size
+        self.slots[i] = slot
+        self.values[i] = value
+
+    def points(self, since: float, now: float):
+        """Yield (ts, min, max, sum, count) for slots in [since, now]."""
+        first = int(since // self.resolution)
+        last = int(now // self.resolution)
+        first = max(first, last - self.size + 1)
+        for slot in range(first, last + 1):
+            i = slot % self.size
+            if self.slots[i] == slot:
+                v = self.values[i]
+                yield slot * self.resolution, v, v, v, 1
+
+
+class AggregateRingBuffer(RingBuffer):
+    """Ring buffer keeping min/max/sum/count per slot for downsampled tiers."""
+
+    def __init__(self, resolution: int, size: int):
+        super().__init__(resolution, size)
+        self.maxes = array("f", bytes(4 * size))
+        self.sums = array("d", bytes(8 * size))
+        self.counts = array("I", bytes(4 * size))
+
+    def add(self, ts: float, value: float):
+        slot = int(ts // self.resolution)
+        i = slot % self.size
+        if self.slots[i] != slot:
+            self.slots[i] = slot
+            self.values[i] = value
+            self.maxes[i] = value
+            self.sums[i] = value
+            self.counts[i] = 1
+            return
+        if value < self.values[i]:
+            self.values[i] = value
+        if value > self.maxes[i]:
+            self.maxes[i] = value
+        self.sums[i] += value
+        self.counts[i] += 1
+
+    def points(self, since: float, now: float):
+        first = int(since // self.resolution)
+        last = int(now // self.resolution)
+        first = max(first, last - self.size + 1)
+        for slot in range(first, last + 1):
+            i = slot % self.size
+            if self.slots[i] == slot:
+                yield (slot * self.resolution, self.values[i], self.maxes[i],
+                       self.sums[i], self.counts[i])
+
+
+class MetricSeries:
+    """Raw ring buffer plus downsampled tiers for one (host, metric)."""
+
+    def __init__(self, resolution: int = TIMESERIES_RESOLUTION,
+                 retention: int = TIMESERIES_RETENTION):
+        self.tiers = [RingBuffer(resolution, max(retention // resolution, 1))]
+        for tier_resolution, size in DOWNSAMPLE_TIERS:
+            self.tiers.append(AggregateRingBuffer(tier_resolution, size))
+
+    def add(self, ts: float, value: float):
+        for tier in self.tiers:
+            tier.add(ts, value)
+
+    def tier_for(self, window: float) -> RingBuffer:
+        """Finest tier that covers window seconds."""
+        for tier in self.tiers:
+            if tier.resolution * tier.size >= window:
+                return tier
+        return self.tiers[-1]
+
+    def summary(self, window: float, now: float = None):
+        """Min/max/avg/last and rate of change per hour over window seconds."""
+        now = now or time.time()
+        tier = self.tier_for(window)
+        lo = hi = None
+        total = 0.0
+        count = 0
+        first = last = None
+        for ts, p_min, p_max, p_sum, p_count in tier.points(now - window, now):
+            lo = p_min if lo is None else min(lo, p_min)
+            hi = p_max if hi is None else max(hi, p_max)
+            total += p_sum
+            count += p_count
+            avg = p_sum / p_count
+            if first is None:
+                first = (ts, avg)
+            last = (ts, avg)
+        if not count:
+            return None
+
+        rate = 0.0
+        if last[0] > first[0]:
+            rate = (last[1] - first[1]) / (last[0] - first[0]) * 3600
+        return {
+            "min": lo,
+            "max": hi,
+            "avg": total / count,
+            "last": last[1],
+            "rate_per_hour": rate,
+            "samples": count,
+        }
+
+
+class TimeSeriesStore:
+    """Per-host, per-metric series with fixed memory per series."""
+
+    def __init__(self):
+        self._series = {}
+
+    def record(self, host_id: str, metric: str, value: float, ts: float = None):
+        key = (host_id, metric)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = MetricSeries()
+        series.add(ts or time.time(), value)
+
+    def record_health(self, host_id: str, health, ts: float = None):
+        """Record ram/disk/cpu percentages from a HostHealth-like object."""
+        ts = ts or time.time()
+        self.record(host_id, "ram", health.ram_percent, ts)
+        self.record(host_id, "disk", health.disk_percent, ts)
+        self.record(host_id, "cpu", health.cpu_percent, ts)
+
+    def summary(self, host_id: str, metric: str, window: float = 3600):
+        series = self._series.get((host_id, metric))
+        if series is None:
+            return None
+        return series.summary(window)
+
+    def drop_host(self, host_id: str):
+        for key in [k for k in self._series if k[0] == host_id]:
+            del self._series[key]
+
+
+def format_trend(summary: dict, window_label: str = "1h") -> str:
+    """One-line trend text for a summary() result."""
+    if not summary:
+        return ""
+    return (
+        f"Trend {window_label}: min {summary['min']:.0f}% · max {summary['max']:.0f}% · "
+        f"avg {summary['avg']:.0f}% · {summary['rate_per_hour']:+.1f}%/h"
+    )
+
+
+# Shared history used by alerts, stream and slash commands
+metrics_history = TimeSeriesStore()
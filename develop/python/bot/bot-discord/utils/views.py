@@ -1,107 +1,139 @@
+import os
+import time
+import asyncio
 import discord
-from utils.ssh import run_ssh_command, SSH_HOST
+from utils.ssh import SSH_HOST, default_host_key
+from utils.cache import run_cached_command, format_age, command_cache
+from utils.collectors import collect_snapshot, snapshot_store
+from utils.docker_stats import docker_stats, format_stats_table, format_stats_compact
+from utils.logs import LOGS_MAX_PAGES, LOGS_FOLLOW_INTERVAL, LOGS_FOLLOW_DURATION
+from utils.streaming import STREAM_EDIT_INTERVAL, STREAM_MAX_DURATION, OUTPUT_PAGE_CHARS
+from utils.telemetry import discord_send_seconds
+from utils.inventory import (
+    SORT_KEYS, STATUS_FILTERS, FLEET_PAGE_CHARS, filter_containers, sort_containers, format_container_lines,
+)
 
 # Try to import hosts manager for multi-host support
 try:
-    from utils.hosts import get_host_list, get_host_display_name, run_ssh_command_on_host, get_default_host
+    from utils.hosts import get_host_list, get_host_display_name
     MULTI_HOST_MODE = True
 except ImportError:
     MULTI_HOST_MODE = False
 
+# Hosts queried in parallel by the host selector
+HOST_SELECT_CONCURRENCY = int(os.getenv("HOST_SELECT_CONCURRENCY", "10"))
 
-def format_memory_compact(output: str) -> str:
-    """Format memory output for mobile."""
-    lines = output.strip().split('\n')
-    if len(lines) < 2:
-        return output
-    
-    parts = lines[1].split()
-    if len(parts) < 7:
-        return output
-    
-    total = parts[1]
-    used = parts[2]
-    available = parts[6]
-    
-    try:
-        total_val = float(total.replace('Gi', '').replace('Mi', ''))
-        used_val = float(used.replace('Gi', '').replace('Mi', ''))
-        pct = (used_val / total_val) * 100
-    except:
-        pct = 0
-    
-    return f"""🧠 **Memory**
+# Discord embed limits
+EMBED_FIELD_LIMIT = 1024
+EMBED_FIELDS_PER_PAGE = 25
+EMBED_CHARS_PER_PAGE = 5500
+
+
+def human_bytes(num: float) -> str:
+    """Bytes to short binary units, like free -h / df -h."""
+    for unit in ("B", "Ki", "Mi", "Gi", "Ti"):
+        if abs(num) < 1024 or unit == "Ti":
+            if unit == "B":
+                return f"{num:.0f}B"
+            return f"{num:.1f}{unit}"
+        num /= 1024
+
+
+def format_duration_long(seconds: float) -> str:
+    """Uptime style duration, e.g. 3 days, 4:05."""
+    seconds = int(seconds)
+    days, rest = divmod(seconds, 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes = rest // 60
+    clock = f"{hours}:{minutes:02d}" if hours else f"{minutes} min"
+    if days:
+        return f"{days} day{'s' if days != 1 else ''}, {clock}"
+    return clock
+
+
+def render_memory(snap, compact: bool = False) -> str:
+    """Render MemInfo from a HostSnapshot."""
+    mem = snap.memory
+    kb = 1024
+    if compact:
+        return f"""🧠 **Memory**
 ━━━━━━━━━━
-Total: {total}
-Used: {used} ({pct:.0f}%)
-Avail: {available}"""
+Total: {human_bytes(mem.total_kb * kb)}
+Used: {human_bytes(mem.used_kb * kb)} ({mem.percent:.0f}%)
+Avail: {human_bytes(mem.available_kb * kb)}"""
 
+    buff_cache = (mem.buffers_kb + mem.cached_kb) * kb
+    lines = [
+        f"{'':6}{'total':>9}{'used':>9}{'free':>9}{'buff/cache':>12}{'available':>11}",
+        f"{'Mem:':6}{human_bytes(mem.total_kb * kb):>9}{human_bytes(mem.used_kb * kb):>9}"
+        f"{human_bytes(mem.free_kb * kb):>9}{human_bytes(buff_cache):>12}"
+        f"{human_bytes(mem.available_kb * kb):>11}",
+        f"{'Swap:':6}{human_bytes(mem.swap_total_kb * kb):>9}{human_bytes(mem.swap_used_kb * kb):>9}"
+        f"{human_bytes(mem.swap_free_kb * kb):>9}",
+    ]
+    return "```\n" + "\n".join(lines) + "\n```"
 
-def format_disk_compact(output: str) -> str:
-    """Format disk output for mobile."""
-    lines = output.strip().split('\n')
-    result = "💾 **Disk Usage**\n━━━━━━━━━━\n"
-    
-    for line in lines[1:]:
-        parts = line.split()
-        if len(parts) >= 6:
-            mount = parts[5]
-            size = parts[1]
-            used_pct = parts[4]
-            if mount in ['/', '/home', '/var']:
-                result += f"{mount}: {used_pct} of {size}\n"
-    
-    return result.strip()
 
+def render_cpu(snap, compact: bool = False) -> str:
+    """Render CPU usage, load and top processes from a HostSnapshot."""
+    usage = snap.cpu_usage
+    load = snap.load
+    if compact:
+        return f"""⚡ **CPU Status**
+━━━━━━━━━━
+Usage: {usage.busy:.1f}%
+Load 1m: {load.load1:.2f}
+Load 5m: {load.load5:.2f}"""
+
+    lines = [
+        f"Usage:  {usage.busy:.1f}% (user {usage.user:.1f}%, system {usage.system:.1f}%, "
+        f"iowait {usage.iowait:.1f}%, steal {usage.steal:.1f}%)",
+        f"Load:   {load.load1:.2f} {load.load5:.2f} {load.load15:.2f} ({snap.cpus} cores)",
+        f"Tasks:  {load.running} running / {load.processes} total",
+    ]
+    if snap.processes:
+        lines.append("")
+        lines.append(f"{'PID':>7} {'%CPU':>5} {'%MEM':>5} COMMAND")
+        for proc in snap.processes:
+            lines.append(f"{proc.pid:>7} {proc.cpu_percent:>5.1f} {proc.mem_percent:>5.1f} {proc.command}")
+    return "```\n" + "\n".join(lines) + "\n```"
 
-def format_cpu_compact(output: str) -> str:
-    """Format CPU output for mobile."""
-    lines = output.strip().split('\n')
-    result = "⚡ **CPU Status**\n━━━━━━━━━━\n"
-    
-    for line in lines:
-        if 'load average' in line:
-            parts = line.split('load average:')
-            if len(parts) > 1:
-                loads = parts[1].strip().split(',')
-                result += f"Load 1m: {loads[0].strip()}\n"
-                if len(loads) > 1:
-                    result += f"Load 5m: {loads[1].strip()}\n"
-        elif '%Cpu' in line or 'Cpu(s)' in line:
-            if 'id' in line:
-                parts = line.split(',')
-                for part in parts:
-                    if 'id' in part:
-                        idle = part.strip().split()[0]
-                        used = 100 - float(idle)
-                        result += f"Usage: {used:.1f}%\n"
-                        break
-    
-    return result.strip() if result.count('\n') > 1 else output
 
+def render_disk(snap, compact: bool = False) -> str:
+    """Render filesystem usage from a HostSnapshot."""
+    if compact:
+        result = "💾 **Disk Usage**\n━━━━━━━━━━\n"
+        for fs in snap.filesystems:
+            result += f"{fs.mount}: {fs.percent:.0f}% of {human_bytes(fs.size_bytes)}\n"
+        return result.strip()
 
-def format_uptime_compact(output: str) -> str:
-    """Format uptime output for mobile."""
-    line = output.strip()
-    result = "⏱️ **Uptime**\n━━━━━━━━━━\n"
-    
-    if 'up' in line:
-        parts = line.split('up')
-        if len(parts) > 1:
-            uptime_part = parts[1].split(',')[0].strip()
-            result += f"Up: {uptime_part}\n"
-    
-    if 'user' in line:
-        for part in line.split(','):
-            if 'user' in part:
-                result += f"Users: {part.strip()}\n"
-                break
-    
-    if 'load average' in line:
-        loads = line.split('load average:')[1].strip()
-        result += f"Load: {loads}"
-    
-    return result.strip()
+    width = max([len(fs.mount) for fs in snap.filesystems] + [5])
+    lines = [f"{'Mount':<{width}} {'Size':>8} {'Used':>8} {'Avail':>8} {'Use%':>5}"]
+    for fs in snap.filesystems:
+        lines.append(
+            f"{fs.mount:<{width}} {human_bytes(fs.size_bytes):>8} {human_bytes(fs.used_bytes):>8} "
+            f"{human_bytes(fs.avail_bytes):>8} {fs.percent:>4.0f}%"
+        )
+    return "```\n" + "\n".join(lines) + "\n```"
+
+
+def render_uptime(snap, compact: bool = False) -> str:
+    """Render uptime and load from a HostSnapshot."""
+    up = format_duration_long(snap.uptime_seconds)
+    load = snap.load
+    loads = f"{load.load1:.2f}, {load.load5:.2f}, {load.load15:.2f}"
+    if compact:
+        return f"""⏱️ **Uptime**
+━━━━━━━━━━
+Up: {up}
+Load: {loads}"""
+    text = f"up {up}, {load.processes} processes, load average: {loads}"
+    facts = snap.facts
+    if facts:
+        text += f"\nkernel {facts.kernel}, {snap.cpus} CPUs, {human_bytes(facts.mem_total_kb * 1024)} RAM"
+        if facts.docker_version:
+            text += f", docker {facts.docker_version}"
+    return f"```\n{text}\n```"
 
 
 def format_containers_compact(output: str) -> str:
@@ -127,6 +159,122 @@ def format_containers_compact(output: str) -> str:
     return result.strip()
 
 
+def format_sample_memory(sample) -> str:
+    """Format memory from a live stream sample."""
+    total_gb = sample.mem_total_kb / 1048576
+    used_gb = (sample.mem_total_kb - sample.mem_available_kb) / 1048576
+    avail_gb = sample.mem_available_kb / 1048576
+    return f"""🧠 **Memory**
+━━━━━━━━━━
+Total: {total_gb:.1f}Gi
+Used: {used_gb:.1f}Gi ({sample.ram_percent:.0f}%)
+Avail: {avail_gb:.1f}Gi"""
+
+
+def format_sample_cpu(sample) -> str:
+    """Format CPU from a live stream sample."""
+    return f"""⚡ **CPU Status**
+━━━━━━━━━━
+Usage: {sample.cpu_busy_percent:.1f}%
+Load 1m: {sample.load1:.2f}
+Load 5m: {sample.load5:.2f}
+Cores: {sample.cpus}"""
+
+
+def format_sample_disk(sample) -> str:
+    """Format root filesystem usage from a live stream sample."""
+    size_gb = sample.disk_blocks * sample.disk_block_size / 1073741824
+    return f"""💾 **Disk Usage**
+━━━━━━━━━━
+/: {sample.disk_percent:.0f}% of {size_gb:.0f}G"""
+
+
+CONTAINERS_COMMAND = "docker ps --format 'table {{.Names}}\t{{.Status}}\t{{.Ports}}'"
+
+COMMAND_LABELS = {
+    "memory": "Memory",
+    "cpu": "CPU",
+    "disk": "Disk",
+    "uptime": "Uptime",
+    "containers": "Containers",
+}
+
+# Commands answered from /proc snapshots
+SNAPSHOT_RENDERERS = {
+    "memory": render_memory,
+    "cpu": render_cpu,
+    "disk": render_disk,
+    "uptime": render_uptime,
+}
+
+
+async def fetch_formatted(command_type: str, host_id: str = None, compact: bool = False,
+                          live: bool = False):
+    """Collect and render command_type for host. Returns (text, age_seconds)."""
+    renderer = SNAPSHOT_RENDERERS.get(command_type)
+    if renderer:
+        snap, age = await collect_snapshot(host_id, live=live)
+        return renderer(snap, compact), age
+
+    if command_type != "containers":
+        raise ValueError(f"Unknown command: {command_type}")
+    if live:
+        command_cache.invalidate(host_id or SSH_HOST)
+    output, age = await run_cached_command(CONTAINERS_COMMAND, host_id)
+    # Resource usage from the background docker stats collector, if running
+    stats = docker_stats.latest(host_id or default_host_key())
+    if compact:
+        text = format_containers_compact(output)
+        if stats:
+            text += "\n━━━━━━━━━━\n" + format_stats_compact(stats[0])
+        return text, age
+    text = f"```\n{output}\n```"
+    if stats:
+        text += f"```\n{format_stats_table(stats[0])}\n```"
+    return text, age
+
+
+def snapshot_formatted(command_type: str, host_id: str = None, compact: bool = False):
+    """(text, age) rendered from the background snapshot without I/O, or None."""
+    renderer = SNAPSHOT_RENDERERS.get(command_type)
+    if not renderer:
+        return None
+    latest = snapshot_store.get(host_id or default_host_key())
+    if not latest:
+        return None
+    snap, age = latest
+    return renderer(snap, compact), age
+
+
+async def send_formatted(interaction: discord.Interaction, command_type: str, compact: bool = False,
+                         live: bool = False, suffix: str = "", ephemeral_errors: bool = False):
+    """Reply with command_type for the default host.
+
+    Answers immediately from the background snapshot when it is fresh,
+    otherwise (or with live) defers and collects over SSH.
+    """
+    label = COMMAND_LABELS[command_type]
+    view = QuickActionsView(command_type, compact)
+    cached = None if live else snapshot_formatted(command_type, compact=compact)
+    if cached:
+        text, age = cached
+        await interaction.response.send_message(
+            f"**{label} on {SSH_HOST}:** _snapshot {age:.0f}s ago_\n{text}{suffix}",
+            view=view
+        )
+        return
+
+    await interaction.response.defer()
+    try:
+        formatted, age = await fetch_formatted(command_type, compact=compact, live=live)
+        await interaction.followup.send(
+            f"**{label} on {SSH_HOST}:** _{format_age(age)}_\n{formatted}{suffix}",
+            view=view
+        )
+    except Exception as e:
+        await interaction.followup.send(f"Error: {e}", ephemeral=ephemeral_errors)
+
+
 class HostSelectView(discord.ui.View):
     """View with host selection dropdown."""
     
@@ -163,57 +311,373 @@ class HostSelect(discord.ui.Select):
             options=options
         )
     
-    def format_output(self, cmd_type: str, output: str) -> str:
-        if not self.compact:
-            return f"```\n{output}\n```"
-        
-        formatters = {
-            "memory": format_memory_compact,
-            "cpu": format_cpu_compact,
-            "disk": format_disk_compact,
-            "uptime": format_uptime_compact,
-            "containers": format_containers_compact,
-        }
-        
-        formatter = formatters.get(cmd_type)
-        if formatter:
-            return formatter(output)
-        return f"```\n{output}\n```"
-    
     async def callback(self, interaction: discord.Interaction):
         await interaction.response.defer()
         
-        commands_map = {
-            "memory": ("free -mh", "Memory"),
-            "cpu": ("top -bn1 | head -20", "CPU"),
-            "disk": ("df -h", "Disk"),
-            "uptime": ("uptime", "Uptime"),
-            "containers": ("docker ps --format 'table {{.Names}}\t{{.Status}}\t{{.Ports}}'", "Containers"),
-        }
-        
-        if self.command_type not in commands_map:
+        if self.command_type not in COMMAND_LABELS:
             await interaction.followup.send("Unknown command", ephemeral=True)
             return
         
-        cmd, label = commands_map[self.command_type]
+        label = COMMAND_LABELS[self.command_type]
         
         selected_hosts = self.values
         if "__all__" in selected_hosts:
             selected_hosts = get_host_list()
         
-        for host_id in selected_hosts:
+        semaphore = asyncio.Semaphore(HOST_SELECT_CONCURRENCY)
+        results = await asyncio.gather(
+            *(query_host(semaphore, host_id, self.command_type, self.compact) for host_id in selected_hosts)
+        )
+        
+        pages = build_host_pages(label, results)
+        if len(pages) == 1:
+            await interaction.followup.send(
+                embed=pages[0],
+                view=QuickActionsView(self.command_type, self.compact)
+            )
+        else:
+            await interaction.followup.send(embed=pages[0], view=PaginatorView(pages))
+
+
+async def query_host(semaphore: asyncio.Semaphore, host_id: str, command_type: str, compact: bool):
+    """Fetch command_type on host under semaphore. Returns (host_id, text, age, latency, error)."""
+    async with semaphore:
+        started = time.monotonic()
+        try:
+            text, age = await fetch_formatted(command_type, host_id, compact)
+            return host_id, text, age, time.monotonic() - started, None
+        except Exception as e:
+            return host_id, None, None, time.monotonic() - started, e
+
+
+def fit_field(text: str, limit: int = EMBED_FIELD_LIMIT) -> str:
+    """Trim rendered text to limit, keeping code blocks closed."""
+    if len(text) <= limit:
+        return text
+    if text.startswith("```"):
+        return text[:limit - 6] + "\n…```"
+    return text[:limit - 2] + "\n…"
+
+
+def build_host_pages(label: str, results) -> list:
+    """Build embed pages with one field per host result."""
+    ok = sum(1 for r in results if r[4] is None)
+    title = f"{label} · {ok}/{len(results)} hosts"
+    pages = []
+    embed = None
+    chars = 0
+    for host_id, text, age, latency, error in results:
+        display_name = get_host_display_name(host_id)
+        if error is None:
+            name = f"✅ {display_name} · {latency * 1000:.0f} ms · {format_age(age)}"
+            value = fit_field(text)
+        else:
+            name = f"❌ {display_name} · {latency * 1000:.0f} ms"
+            value = str(error)[:EMBED_FIELD_LIMIT] or type(error).__name__
+        size = len(name) + len(value)
+        if embed is None or len(embed.fields) >= EMBED_FIELDS_PER_PAGE or chars + size > EMBED_CHARS_PER_PAGE:
+            embed = discord.Embed(title=title, color=discord.Color.blue())
+            pages.append(embed)
+            chars = len(title)
+        embed.add_field(name=name, value=value, inline=False)
+        chars += size
+    if len(pages) > 1:
+        for i, page in enumerate(pages, 1):
+            page.set_footer(text=f"Page {i}/{len(pages)}")
+    return pages or [discord.Embed(title=title, description="No hosts selected")]
+
+
+class PaginatorView(discord.ui.View):
+    """Prev/next buttons over a list of embeds."""
+    
+    def __init__(self, pages: list):
+        super().__init__(timeout=300)
+        self.pages = pages
+        self.page = 0
+    
+    async def show(self, interaction: discord.Interaction):
+        await interaction.response.edit_message(embed=self.pages[self.page], view=self)
+    
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = (self.page - 1) % len(self.pages)
+        await self.show(interaction)
+    
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = (self.page + 1) % len(self.pages)
+        await self.show(interaction)
+
+
+class FleetContainersView(discord.ui.View):
+    """Sortable, filterable table over a FleetInventory.
+
+    Sorting, filtering and paging re-render the inventory already held by
+    the view; only 🔄 collects again (through refresh()).
+    """
+
+    def __init__(self, inventory, refresh, host_names: dict = None, name: str = None,
+                 status: str = "all", host: str = None, sort: str = "name"):
+        super().__init__(timeout=600)
+        self.inventory = inventory
+        self.refresh = refresh
+        self.host_names = host_names or {}
+        self.name = name
+        self.status = status
+        self.host = host
+        self.sort = sort
+        self.page = 0
+
+        self.sort_select.options = [
+            discord.SelectOption(label=f"Sort by {k}", value=k, default=k == sort) for k in SORT_KEYS
+        ]
+        self.status_select.options = [
+            discord.SelectOption(label=f"Status: {f}", value=f, default=f == status) for f in STATUS_FILTERS
+        ]
+        hosts = sorted(inventory.hosts, key=lambda h: self.host_names.get(h, h))
+        if 1 < len(hosts) <= 24:
+            self.host_select.options = [discord.SelectOption(label="All hosts", value="__all__", default=host is None)] + [
+                discord.SelectOption(label=self.host_names.get(h, h)[:100], value=h, default=h == host)
+                for h in hosts
+            ]
+        else:
+            self.remove_item(self.host_select)
+        self.pages = self.build_pages()
+        self.update_buttons()
+
+    def build_pages(self) -> list:
+        containers = filter_containers(self.inventory.containers, self.name, self.status, self.host)
+        lines = format_container_lines(sort_containers(containers, self.sort), self.host_names)
+        header, rows = lines[0], lines[1:]
+        pages = []
+        page = []
+        size = 0
+        for row in rows:
+            if page and size + len(row) + 1 > FLEET_PAGE_CHARS - len(header):
+                pages.append(page)
+                page, size = [], 0
+            page.append(row)
+            size += len(row) + 1
+        pages.append(page)
+        self.shown = len(rows)
+        return ["\n".join([header] + p) if p else "(no containers match)" for p in pages]
+
+    def render(self) -> str:
+        inv = self.inventory
+        filters = [f"status {self.status}"] if self.status != "all" else []
+        if self.name:
+            filters.append(f"name ~ {self.name}")
+        if self.host:
+            filters.append(f"host {self.host_names.get(self.host, self.host)}")
+        ok = len(inv.hosts) - len(inv.errors)
+        text = (
+            f"**Fleet containers** · {self.shown}/{len(inv.containers)} on {ok}/{len(inv.hosts)} hosts · "
+            f"_{format_age(inv.age)}, {inv.duration:.1f}s_"
+            + (f" · {', '.join(filters)}" if filters else "")
+            + (f" · page {self.page + 1}/{len(self.pages)}" if len(self.pages) > 1 else "")
+            + f"\n```\n{self.pages[self.page]}\n```"
+        )
+        if inv.errors:
+            errors = "\n".join(
+                f"❌ {self.host_names.get(h, h)}: {e[:80]}" for h, e in sorted(inv.errors.items())[:5]
+            )
+            more = len(inv.errors) - 5
+            text += "\n" + errors + (f"\n… and {more} more" if more > 0 else "")
+        return text[:2000]
+
+    def update_buttons(self):
+        self.prev_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= len(self.pages) - 1
+
+    async def show(self, interaction: discord.Interaction, reset: bool = True):
+        if reset:
+            self.pages = self.build_pages()
+            self.page = min(self.page, len(self.pages) - 1)
+        self.update_buttons()
+        await interaction.response.edit_message(content=self.render(), view=self)
+
+    def select_defaults(self, select: discord.ui.Select, value: str):
+        for option in select.options:
+            option.default = option.value == value
+
+    @discord.ui.select(placeholder="Sort by…", row=0)
+    async def sort_select(self, interaction: discord.Interaction, select: discord.ui.Select):
+        self.sort = select.values[0]
+        self.select_defaults(select, self.sort)
+        await self.show(interaction)
+
+    @discord.ui.select(placeholder="Status…", row=1)
+    async def status_select(self, interaction: discord.Interaction, select: discord.ui.Select):
+        self.status = select.values[0]
+        self.select_defaults(select, self.status)
+        self.page = 0
+        await self.show(interaction)
+
+    @discord.ui.select(placeholder="Host…", row=2)
+    async def host_select(self, interaction: discord.Interaction, select: discord.ui.Select):
+        value = select.values[0]
+        self.host = None if value == "__all__" else value
+        self.select_defaults(select, value)
+        self.page = 0
+        await self.show(interaction)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary, row=3)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = max(self.page - 1, 0)
+        await self.show(interaction, reset=False)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary, row=3)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = min(self.page + 1, len(self.pages) - 1)
+        await self.show(interaction, reset=False)
+
+    @discord.ui.button(label="🔄 live", style=discord.ButtonStyle.primary, row=3)
+    async def refresh_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer()
+        self.inventory = await self.refresh()
+        self.pages = self.build_pages()
+        self.page = min(self.page, len(self.pages) - 1)
+        self.update_buttons()
+        await interaction.edit_original_response(content=self.render(), view=self)
+
+
+class LogPagerView(discord.ui.View):
+    """Prev/next over log pages read lazily from an OutputReader."""
+
+    def __init__(self, reader, title: str, first_page: str):
+        super().__init__(timeout=300)
+        self.reader = reader
+        self.title = title
+        self.pages = [first_page]
+        self.page = 0
+        self.first_number = 1
+        self.update_buttons()
+
+    def render(self) -> str:
+        number = self.first_number + self.page
+        more = "" if self.reader.exhausted and self.page == len(self.pages) - 1 else " ▶"
+        return f"**{self.title}** — page {number}{more}\n```\n{self.pages[self.page]}\n```"
+
+    def update_buttons(self):
+        self.prev_page.disabled = self.page == 0
+        self.next_page.disabled = self.reader.exhausted and self.page == len(self.pages) - 1
+
+    async def show(self, interaction: discord.Interaction):
+        self.update_buttons()
+        await interaction.response.edit_message(content=self.render(), view=self)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = max(self.page - 1, 0)
+        await self.show(interaction)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.page + 1 < len(self.pages):
+            self.page += 1
+        else:
+            page = await self.reader.read_page()
+            if page is not None:
+                self.pages.append(page)
+                self.page += 1
+                if len(self.pages) > LOGS_MAX_PAGES:
+                    self.pages.pop(0)
+                    self.page -= 1
+                    self.first_number += 1
+        await self.show(interaction)
+
+    async def on_timeout(self):
+        await self.reader.close()
+
+
+class StreamingView(discord.ui.View):
+    """Streams an OutputReader into one message, editing it as lines arrive.
+
+    The first line is shown as soon as it is read; later edits are
+    throttled to one per interval. Only the latest lines that fit the
+    message are kept. Ends when the output ends, after duration seconds or
+    on ⏹ Stop.
+    """
+
+    def __init__(self, reader, title: str, interval: float = STREAM_EDIT_INTERVAL,
+                 duration: float = STREAM_MAX_DURATION, running: str = "running"):
+        super().__init__(timeout=duration + 60)
+        self.reader = reader
+        self.title = title
+        self.interval = interval
+        self.duration = duration
+        self.running = running
+        self.lines = []
+        self.size = 0
+        self.stopped = False
+        self.finished = False
+        self.message = None
+
+    def add_line(self, line: str):
+        line = line[:OUTPUT_PAGE_CHARS]
+        self.lines.append(line)
+        self.size += len(line) + 1
+        while self.size > OUTPUT_PAGE_CHARS:
+            self.size -= len(self.lines.pop(0)) + 1
+
+    def state(self) -> str:
+        if self.finished:
+            status = self.reader.exit_status
+            return "done" if not status else f"done, exit {status}"
+        return "stopped" if self.stopped else self.running
+
+    def render(self) -> str:
+        text = "\n".join(self.lines) or "(no output yet)"
+        return f"**{self.title}** — _{self.state()}_\n```\n{text}\n```"
+
+    async def run(self, message: discord.Message):
+        """Read lines and edit message at most every interval seconds."""
+        self.message = message
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.duration
+        next_edit = 0.0
+        dirty = False
+        try:
+            while not self.stopped and loop.time() < deadline:
+                timeout = max(min(deadline, next_edit if dirty else deadline) - loop.time(), 0)
+                try:
+                    line = await asyncio.wait_for(self.reader.readline(), timeout)
+                except asyncio.TimeoutError:
+                    line = ""
+                if line is None:
+                    self.finished = True
+                    break
+                if line:
+                    self.add_line(line)
+                    dirty = True
+                if dirty and loop.time() >= next_edit:
+                    with discord_send_seconds.time(kind="stream_edit"):
+                        await message.edit(content=self.render())
+                    next_edit = loop.time() + self.interval
+                    dirty = False
+        finally:
+            self.stopped = True
+            await self.reader.close()
+            self.stop_button.disabled = True
             try:
-                output = await run_ssh_command_on_host(host_id, cmd)
-                display_name = get_host_display_name(host_id)
-                formatted = self.format_output(self.command_type, output)
-                
-                await interaction.followup.send(
-                    f"**{label} on {display_name}:**\n{formatted}",
-                    view=QuickActionsView(self.command_type, self.compact)
-                )
-            except Exception as e:
-                display_name = get_host_display_name(host_id)
-                await interaction.followup.send(f"❌ **{display_name}:** {str(e)}")
+                await message.edit(content=self.render(), view=self)
+            except discord.HTTPException:
+                pass
+            self.stop()
+
+    @discord.ui.button(label="⏹ Stop", style=discord.ButtonStyle.danger)
+    async def stop_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.stopped = True
+        await interaction.response.defer()
+        await self.reader.close()
+
+
+class LogFollowView(StreamingView):
+    """Follows docker logs, editing one message with the latest lines."""
+
+    def __init__(self, reader, title: str):
+        super().__init__(reader, title, interval=LOGS_FOLLOW_INTERVAL,
+                         duration=LOGS_FOLLOW_DURATION, running="following")
 
 
 class QuickActionsView(discord.ui.View):
@@ -222,22 +686,9 @@ class QuickActionsView(discord.ui.View):
         self.current_command = current_command
         self.compact = compact
 
-    def format_output(self, cmd_type: str, output: str) -> str:
-        if not self.compact:
-            return f"```\n{output}\n```"
-        
-        formatters = {
-            "memory": format_memory_compact,
-            "cpu": format_cpu_compact,
-            "disk": format_disk_compact,
-            "uptime": format_uptime_compact,
-            "containers": format_containers_compact,
-        }
-        
-        formatter = formatters.get(cmd_type)
-        if formatter:
-            return formatter(output)
-        return f"```\n{output}\n```"
+    async def send_command(self, interaction: discord.Interaction, command_type: str, live: bool = False):
+        """Reply with command_type on the default host and a new view."""
+        await send_formatted(interaction, command_type, self.compact, live=live, ephemeral_errors=True)
 
     @discord.ui.button(label="📱", style=discord.ButtonStyle.secondary, custom_id="toggle_compact", row=0)
     async def toggle_compact(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -262,89 +713,29 @@ class QuickActionsView(discord.ui.View):
             ephemeral=True
         )
 
-    @discord.ui.button(label="🔄", style=discord.ButtonStyle.primary, custom_id="refresh_btn", row=0)
+    @discord.ui.button(label="🔄 live", style=discord.ButtonStyle.primary, custom_id="refresh_btn", row=0)
     async def refresh(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer()
-        try:
-            commands_map = {
-                "memory": ("free -mh", "Memory"),
-                "cpu": ("top -bn1 | head -20", "CPU"),
-                "disk": ("df -h", "Disk"),
-                "uptime": ("uptime", "Uptime"),
-                "containers": ("docker ps --format 'table {{.Names}}\t{{.Status}}\t{{.Ports}}'", "Containers"),
-            }
-            if self.current_command in commands_map:
-                cmd, label = commands_map[self.current_command]
-                output = await run_ssh_command(cmd)
-                formatted = self.format_output(self.current_command, output)
-                await interaction.followup.send(
-                    f"**{label} on {SSH_HOST}:**\n{formatted}",
-                    view=QuickActionsView(self.current_command, self.compact)
-                )
-        except Exception as e:
-            await interaction.followup.send(f"Error: {e}", ephemeral=True)
+        if self.current_command in COMMAND_LABELS:
+            await self.send_command(interaction, self.current_command, live=True)
+        else:
+            await interaction.response.defer()
 
     @discord.ui.button(label="🧠", style=discord.ButtonStyle.secondary, custom_id="mem_btn", row=1)
     async def memory(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer()
-        try:
-            output = await run_ssh_command("free -mh")
-            formatted = self.format_output("memory", output)
-            await interaction.followup.send(
-                f"**Memory on {SSH_HOST}:**\n{formatted}",
-                view=QuickActionsView("memory", self.compact)
-            )
-        except Exception as e:
-            await interaction.followup.send(f"Error: {e}", ephemeral=True)
+        await self.send_command(interaction, "memory")
 
     @discord.ui.button(label="⚡", style=discord.ButtonStyle.secondary, custom_id="cpu_btn", row=1)
     async def cpu(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer()
-        try:
-            output = await run_ssh_command("top -bn1 | head -20")
-            formatted = self.format_output("cpu", output)
-            await interaction.followup.send(
-                f"**CPU on {SSH_HOST}:**\n{formatted}",
-                view=QuickActionsView("cpu", self.compact)
-            )
-        except Exception as e:
-            await interaction.followup.send(f"Error: {e}", ephemeral=True)
+        await self.send_command(interaction, "cpu")
 
     @discord.ui.button(label="💾", style=discord.ButtonStyle.secondary, custom_id="disk_btn", row=1)
     async def disk(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer()
-        try:
-            output = await run_ssh_command("df -h")
-            formatted = self.format_output("disk", output)
-            await interaction.followup.send(
-                f"**Disk on {SSH_HOST}:**\n{formatted}",
-                view=QuickActionsView("disk", self.compact)
-            )
-        except Exception as e:
-            await interaction.followup.send(f"Error: {e}", ephemeral=True)
+        await self.send_command(interaction, "disk")
 
     @discord.ui.button(label="⏱️", style=discord.ButtonStyle.secondary, custom_id="uptime_btn", row=1)
     async def uptime(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer()
-        try:
-            output = await run_ssh_command("uptime")
-            formatted = self.format_output("uptime", output)
-            await interaction.followup.send(
-                f"**Uptime on {SSH_HOST}:**\n{formatted}",
-                view=QuickActionsView("uptime", self.compact)
-            )
-        except Exception as e:
-            await interaction.followup.send(f"Error: {e}", ephemeral=True)
+        await self.send_command(interaction, "uptime")
 
     @discord.ui.button(label="🐳", style=discord.ButtonStyle.success, custom_id="containers_btn", row=2)
     async def containers(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer()
-        try:
-            output = await run_ssh_command("docker ps --format 'table {{.Names}}\t{{.Status}}\t{{.Ports}}'")
-            formatted = self.format_output("containers", output)
-            await interaction.followup.send(
-                f"**Containers on {SSH_HOST}:**\n{formatted}",
-                view=QuickActionsView("containers", self.compact)
-            )
-        except Exception as e:
-            await interaction.followup.send(f"Error: {e}", ephemeral=True)
+        await self.send_command(interaction, "containers")